@@ -4,7 +4,6 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import io
 import json
-import os
 import logging
 from lxml import etree
 from reportlab.lib import colors
@@ -16,7 +15,7 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
 # Импорт MD3 компонентов
-from md3_components import get_md3_css, md3_info_panel, get_md3_table_style, get_md3_chart_colors
+from md3_components import inject_md3_css, md3_info_panel, get_md3_chart_colors
 
 # Импорт функции для построения диаграммы Ганта
 from gantt_chart import create_gantt_chart
@@ -29,10 +28,10 @@ from assignment_parser import parse_assignments
 
 # Импорт утилит для работы с MS Project
 from msproject_utils import (
-    get_namespace, make_tag, find_elements, get_text,
+    get_namespace, make_tag, iter_elements, get_text,
     parse_date, parse_work_hours,
     calculate_available_work_hours, calculate_business_days, calculate_work_capacity,
-    find_task_by_name_and_dates
+    build_task_index, find_task_in_index
 )
 
 # Импорт модулей управления персоналом и оптимизации
@@ -44,27 +43,6 @@ from intelligent_optimization import (
     optimize_with_task_shifting, render_intelligent_optimization
 )
 
-# Функция для определения базового пути (для frozen и обычного режима)
-def get_base_path():
-    """Определяет базовый путь для frozen и обычного режима"""
-    import sys
-    if getattr(sys, 'frozen', False):
-        # Если запущено через PyInstaller
-        # Базовый путь - директория, где находится .exe
-        if hasattr(sys, 'executable'):
-            base_path = os.path.dirname(sys.executable)
-        else:
-            # Fallback
-            base_path = os.path.dirname(os.path.abspath(__file__))
-    else:
-        # Если запущено напрямую через Python
-        base_path = os.path.dirname(os.path.abspath(__file__))
-    
-    return base_path
-
-# Определить базовый путь
-BASE_PATH = get_base_path()
-
 # Конфигурация страницы
 st.set_page_config(
     page_title="Анализатор управления ресурсами",
@@ -73,14 +51,17 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Применение MD3 дизайна
-st.markdown(get_md3_css(), unsafe_allow_html=True)
-
-# Константа пути к файлу сотрудников (абсолютный путь относительно базовой директории)
-EMPLOYEES_FILE = os.path.join(BASE_PATH, "data", "employees.json")
+# Применение MD3 дизайна (тема и стили таблиц)
+inject_md3_css()
 
 # Функции для работы с JSON-файлом сотрудников перенесены в personnel_management.py
 
+# Таблица удаления для str.translate: управляющие символы, кроме tab/LF/CR, и U+FFFE/U+FFFF
+# (суррогаты после декодирования UTF-8 не встречаются)
+_INVALID_XML_CHARS = dict.fromkeys(
+    [c for c in range(0x20) if c not in (0x09, 0x0A, 0x0D)] + [0xFFFE, 0xFFFF]
+)
+
 # MS Project XML Parser
 class MSProjectParser:
     """Парсер для XML-файлов MS Project (.xml, .mspdi)"""
@@ -106,20 +87,8 @@ class MSProjectParser:
         except:
             xml_str = xml_bytes.decode('utf-8', errors='ignore')
         
-        # Функция для проверки допустимости символа
-        def is_valid_xml_char(c):
-            codepoint = ord(c)
-            return (
-                codepoint == 0x09 or
-                codepoint == 0x0A or
-                codepoint == 0x0D or
-                (0x20 <= codepoint <= 0xD7FF) or
-                (0xE000 <= codepoint <= 0xFFFD) or
-                (0x10000 <= codepoint <= 0x10FFFF)
-            )
-        
-        # Фильтруем недопустимые символы
-        cleaned_str = ''.join(c for c in xml_str if is_valid_xml_char(c))
+        # Фильтруем недопустимые символы одним проходом str.translate
+        cleaned_str = xml_str.translate(_INVALID_XML_CHARS)
         
         # Возвращаем обратно в байты
         return cleaned_str.encode('utf-8')
@@ -179,9 +148,7 @@ class MSProjectParser:
     def _parse_tasks(self, root, namespace):
         """Parse task information including dependencies"""
         tasks = []
-        task_elements = find_elements(root, 'Task', namespace)
-        
-        for task in task_elements:
+        for task in iter_elements(root, 'Task', namespace):
             task_id = get_text(task, make_tag('UID', namespace), namespace)
             name = get_text(task, make_tag('Name', namespace), namespace)
             
@@ -195,8 +162,7 @@ class MSProjectParser:
             
             # Парсинг зависимостей задач (PredecessorLink)
             predecessors = []
-            pred_links = find_elements(task, 'PredecessorLink', namespace)
-            for pred in pred_links:
+            for pred in iter_elements(task, 'PredecessorLink', namespace):
                 pred_uid = get_text(pred, make_tag('PredecessorUID', namespace), namespace)
                 if pred_uid:
                     predecessors.append(pred_uid)
@@ -244,9 +210,8 @@ class MSProjectParser:
         # Использовать выбранный диапазон или весь проект
         if date_range_start and date_range_end:
             # Конвертировать date в datetime для вычислений
-            from datetime import datetime as dt_class
-            range_start_dt = dt_class.combine(date_range_start, dt_class.min.time())
-            range_end_dt = dt_class.combine(date_range_end, dt_class.max.time())
+            range_start_dt = datetime.combine(date_range_start, datetime.min.time())
+            range_end_dt = datetime.combine(date_range_end, datetime.max.time())
         else:
             range_start_dt = project_start
             range_end_dt = project_end
@@ -259,6 +224,9 @@ class MSProjectParser:
             default_hours=160
         )
         
+        # Индекс задач по имени и датам (один раз на расчет)
+        task_index = build_task_index(self.tasks)
+        
         for resource in self.resources:
             # Get all assignments for this resource (по имени)
             resource_name = resource.get('name', '')
@@ -274,8 +242,8 @@ class MSProjectParser:
             
             for assignment in resource_assignments:
                 # Get task info по комбинации имени и дат
-                task = find_task_by_name_and_dates(
-                    self.tasks,
+                task = find_task_in_index(
+                    task_index,
                     assignment.get('task_name'),
                     assignment.get('task_start'),
                     assignment.get('task_finish')
@@ -396,9 +364,8 @@ class MSProjectParser:
         
         # Использовать выбранный диапазон или весь проект
         if date_range_start and date_range_end:
-            from datetime import datetime as dt_class
-            range_start_dt = dt_class.combine(date_range_start, dt_class.min.time())
-            range_end_dt = dt_class.combine(date_range_end, dt_class.max.time())
+            range_start_dt = datetime.combine(date_range_start, datetime.min.time())
+            range_end_dt = datetime.combine(date_range_end, datetime.max.time())
         else:
             range_start_dt = project_start
             range_end_dt = project_end
@@ -418,19 +385,27 @@ class MSProjectParser:
             })
             current_date = week_end + timedelta(days=1)
         
+        # Индекс задач по имени и датам (один раз на расчет)
+        task_index = build_task_index(self.tasks)
+        
         # Для каждого ресурса рассчитать загрузку по неделям
         for resource in self.resources:
             resource_name = resource.get('name', '')
             resource_assignments = [a for a in self.assignments if a.get('resource_name') == resource_name]
             weekly_loads = []
             
+            # Ёмкость за неделю: 5 рабочих дней × 8 часов × max_units
+            # (одинакова для всех недель - считается один раз на ресурс)
+            max_units = float(resource.get('max_units', 1.0))
+            week_capacity = 40 * max_units
+            
             for week in weeks:
                 week_hours = 0
                 
                 for assignment in resource_assignments:
                     # Поиск задачи по комбинации имени и дат
-                    task = find_task_by_name_and_dates(
-                        self.tasks,
+                    task = find_task_in_index(
+                        task_index,
                         assignment.get('task_name'),
                         assignment.get('task_start'),
                         assignment.get('task_finish')
@@ -454,9 +429,6 @@ class MSProjectParser:
                                     proportion = overlap_days / task_duration_days
                                     week_hours += task_total_hours * proportion
                 
-                # Ёмкость за неделю: 5 рабочих дней × 8 часов × max_units
-                max_units = float(resource.get('max_units', 1.0))
-                week_capacity = 40 * max_units
                 week_percentage = (week_hours / week_capacity) * 100 if week_capacity > 0 else 0
                 
                 weekly_loads.append({
@@ -925,6 +897,7 @@ def export_to_csv(workload_df, analysis, parser=None, timeline_data=None, optimi
     if parser:
         csv_buffer.write("ДЕТАЛИЗАЦИЯ ЗАДАЧ ПО РЕСУРСАМ\n")
         csv_buffer.write("Ресурс,ID задачи,Название задачи,Начало,Конец,Трудоёмкость (часы)\n")
+        task_index = build_task_index(parser.tasks)
         
         for resource in parser.resources:
             resource_name = resource['name']
@@ -936,8 +909,8 @@ def export_to_csv(workload_df, analysis, parser=None, timeline_data=None, optimi
             
             for assignment in resource_assignments:
                 # Поиск задачи по комбинации имени и дат
-                task = find_task_by_name_and_dates(
-                    parser.tasks,
+                task = find_task_in_index(
+                    task_index,
                     assignment.get('task_name'),
                     assignment.get('task_start'),
                     assignment.get('task_finish')
@@ -1185,6 +1158,7 @@ def export_to_pdf(workload_df, analysis, recommendations, parser=None, timeline_
         task_table_data = [['Ресурс', 'Задача', 'Начало', 'Конец', 'Часы']]
         task_count = 0
         max_tasks = 50
+        task_index = build_task_index(parser.tasks)
         
         for resource in parser.resources[:10]:  # Ограничить до 10 ресурсов
             resource_name = resource['name']
@@ -1198,8 +1172,8 @@ def export_to_pdf(workload_df, analysis, recommendations, parser=None, timeline_
                 if task_count >= max_tasks:
                     break
                 # Поиск задачи по комбинации имени и дат
-                task = find_task_by_name_and_dates(
-                    parser.tasks,
+                task = find_task_in_index(
+                    task_index,
                     assignment.get('task_name'),
                     assignment.get('task_start'),
                     assignment.get('task_finish')
@@ -2048,9 +2022,6 @@ def main():
             
             # Таблица анализа рабочей нагрузки
             with st.expander("### 📈 Анализ рабочей нагрузки", expanded=False):
-                # Применить MD3 стили для таблиц
-                st.markdown(get_md3_table_style(), unsafe_allow_html=True)
-                
                 # Рассчитать фактические часы для каждого ресурса за период
                 actual_hours_dict = {}
                 if st.session_state.parser and st.session_state.date_range_start and st.session_state.date_range_end:
@@ -1,6 +1,8 @@
 """
 Модуль для парсинга назначений (assignments) из XML файлов MS Project
 """
+import logging
+
 from msproject_utils import setup_logger, get_text, make_tag, find_elements
 
 # Настройка логирования
@@ -40,8 +42,19 @@ def parse_assignments(root, namespace, resources, tasks):
     resource_ids = {str(r['id']) for r in resources}  # Преобразуем в строки для сравнения
     task_ids = {str(t['id']) for t in tasks}  # Преобразуем в строки для сравнения
     
-    logger.debug(f"Доступные resource_ids: {sorted(resource_ids)[:10]}... (всего {len(resource_ids)})")
-    logger.debug(f"Доступные task_ids: {sorted(task_ids)[:10]}... (всего {len(task_ids)})")
+    # Сообщения уровня DEBUG строятся только при включенном уровне: f-строка и
+    # сортировка всех идентификаторов выполнялись бы и тогда, когда запись отбрасывается
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    if debug_enabled:
+        logger.debug(f"Доступные resource_ids: {sorted(resource_ids)[:10]}... (всего {len(resource_ids)})")
+        logger.debug(f"Доступные task_ids: {sorted(task_ids)[:10]}... (всего {len(task_ids)})")
+    
+    # Теги полей назначения вычисляются один раз, а не для каждого назначения
+    task_uid_tag = make_tag('TaskUID', namespace)
+    resource_uid_tag = make_tag('ResourceUID', namespace)
+    work_tag = make_tag('Work', namespace)
+    resource_name_tag = make_tag('ResourceName', namespace)
+    units_tag = make_tag('Units', namespace)
     
     skipped_no_resource = 0
     skipped_no_task = 0
@@ -50,12 +63,12 @@ def parse_assignments(root, namespace, resources, tasks):
     
     for idx, assignment in enumerate(assignment_elements):
         try:
-            task_uid = get_text(assignment, make_tag('TaskUID', namespace), namespace)
-            resource_uid = get_text(assignment, make_tag('ResourceUID', namespace), namespace)
-            work = get_text(assignment, make_tag('Work', namespace), namespace)
+            task_uid = get_text(assignment, task_uid_tag, namespace)
+            resource_uid = get_text(assignment, resource_uid_tag, namespace)
+            work = get_text(assignment, work_tag, namespace)
             
             # Попытка извлечь имя ресурса напрямую из XML
-            resource_name_direct = get_text(assignment, make_tag('ResourceName', namespace), namespace, default='')
+            resource_name_direct = get_text(assignment, resource_name_tag, namespace, default='')
             
             # Валидация: проверяем существование ресурса и задачи
             if not task_uid or not resource_uid:
@@ -77,7 +90,8 @@ def parse_assignments(root, namespace, resources, tasks):
             if resource_name_direct:
                 # Использовать имя из XML напрямую
                 resource_name = resource_name_direct
-                logger.debug(f"Назначение #{idx}: resource_name извлечен напрямую из XML: {resource_name}")
+                if debug_enabled:
+                    logger.debug(f"Назначение #{idx}: resource_name извлечен напрямую из XML: {resource_name}")
             else:
                 # Использовать текущую логику (поиск по ResourceUID)
                 # Проверка существования ресурса по ID (для парсинга XML)
@@ -98,7 +112,8 @@ def parse_assignments(root, namespace, resources, tasks):
                     logger.warning(f"Назначение #{idx}: Ресурс с ID={resource_uid_str} не имеет имени!")
                     skipped_no_resource += 1
                     continue
-                logger.debug(f"Назначение #{idx}: resource_name получен через ResourceUID: {resource_name}")
+                if debug_enabled:
+                    logger.debug(f"Назначение #{idx}: resource_name получен через ResourceUID: {resource_name}")
             
             # Проверка существования задачи
             if task_uid_str not in task_ids:
@@ -132,7 +147,7 @@ def parse_assignments(root, namespace, resources, tasks):
                 'task_finish': task_finish,  # Для связывания
                 'resource_name': resource_name,  # Для связывания
                 'work': work,
-                'units': get_text(assignment, make_tag('Units', namespace), namespace, default='1.0')
+                'units': get_text(assignment, units_tag, namespace, default='1.0')
             })
             parsed_count += 1
             
@@ -3,6 +3,7 @@ CLI интерфейс для подключения к MS Project Server
 Позволяет вводить параметры подключения через терминал
 """
 import getpass
+import logging
 from server_connection import MSProjectServerConnection
 from server_data_loader import MSProjectServerDataLoader
 
@@ -63,7 +64,10 @@ def main():
     """
     Главная функция с интерактивным меню
     """
+    # Одно подключение и один загрузчик на весь сеанс CLI: загрузчик берет сессию
+    # из подключения при каждом запросе, поэтому после переподключения не пересоздается
     connection = MSProjectServerConnection()
+    data_loader = MSProjectServerDataLoader(connection)
     
     while True:
         print("\n" + "=" * 50)
@@ -88,14 +92,14 @@ def main():
                 if params:
                     server_url, username, password, domain = params
                     print("\n⏳ Попытка подключения...")
-                    success = connection.connect(server_url, username, password, domain)
+                    success = connection.connect(
+                        server_url, username, password, domain,
+                        verify_on_connect=True, prefer_kerberos=True
+                    )
                     if success:
                         print("\n✓ Успешно подключено!")
                         print_status(connection)
                         
-                        # Создание загрузчика данных
-                        data_loader = MSProjectServerDataLoader(connection)
-                        
                         # Загрузка и вывод проектов
                         try:
                             print("\n⏳ Загрузка проектов...")
@@ -143,6 +147,10 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(name)s - %(levelname)s - %(message)s'
+    )
     try:
         main()
     except KeyboardInterrupt:
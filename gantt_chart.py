@@ -5,7 +5,7 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from collections import defaultdict
 import os
-from msproject_utils import parse_date, find_task_by_name_and_dates
+from msproject_utils import parse_date, build_task_index, find_task_in_index
 
 
 def _remove_file_extension(file_name):
@@ -206,6 +206,9 @@ def create_gantt_chart(parser, selected_resources=None, resource_groups=None, da
             # MSProjectParser
             resources_to_process = parser.resources
         
+        # Индекс задач по имени и датам (один раз на построение диаграммы)
+        task_index = build_task_index(parser.tasks)
+        
         # Проходим по ресурсам (как в разделе "Детализация задач")
         for resource in resources_to_process:
             resource_name = resource.get('name', '')
@@ -225,8 +228,8 @@ def create_gantt_chart(parser, selected_resources=None, resource_groups=None, da
             # Обработать каждое назначение
             for assignment in resource_assignments:
                 # Поиск задачи по комбинации имени и дат
-                task = find_task_by_name_and_dates(
-                    parser.tasks,
+                task = find_task_in_index(
+                    task_index,
                     assignment.get('task_name'),
                     assignment.get('task_start'),
                     assignment.get('task_finish')
@@ -2,179 +2,145 @@
 Модуль интеллектуальной оптимизации
 Содержит функции для оптимизации распределения задач и UI компонент
 """
+import heapq
+from collections import deque
 import streamlit as st
-from datetime import datetime, timedelta
-from msproject_utils import find_task_by_name_and_dates
+import numpy as np
+from datetime import date, datetime
+from msproject_utils import build_task_index, find_task_in_index, parse_work_hours_batch
 
 
-def check_task_dependencies(task_id, new_start, new_end, parser, task_dict):
-    """
-    Проверяет, что сдвиг задачи не нарушает зависимости с предшественниками
-    
-    Returns:
-        (is_valid, blocking_tasks) - можно ли сдвинуть и список блокирующих задач
-    """
-    task = task_dict.get(task_id)
-    if not task or not task.get('predecessors'):
-        return True, []  # Нет зависимостей - можно сдвигать
-    
-    blocking_tasks = []
-    
-    # Проверить все предшественники
-    for pred_id in task['predecessors']:
-        pred_task = task_dict.get(pred_id)
-        if not pred_task or not pred_task.get('finish'):
-            continue
-        
-        pred_end = parser._parse_date(pred_task['finish'])
-        if not pred_end:
-            continue
-        
-        # Проверить, что предшественник завершился до начала задачи
-        # (простая зависимость Finish-to-Start)
-        if new_start < pred_end:
-            blocking_tasks.append({
-                'id': pred_id,
-                'name': pred_task.get('name', 'Unknown'),
-                'finish': pred_end.strftime('%Y-%m-%d'),
-                'required_start': pred_end.strftime('%Y-%m-%d')
-            })
-    
-    return len(blocking_tasks) == 0, blocking_tasks
+def _to_ord(dt):
+    """Порядковый номер дня (date.toordinal) для date или datetime"""
+    return dt.toordinal()
+
 
+def _from_ord(day_ord):
+    """Дата по порядковому номеру дня"""
+    return date.fromordinal(day_ord)
 
-def calculate_precise_improvement(task_info, source_week, target_week, shift_days, 
-                                   task_start, task_end, task_hours, weeks_with_dates, weekly_loads):
+
+def build_critical_finish_index(parser, task_dict):
     """
-    Точный расчет улучшения с учетом частичных перекрытий задачи с неделями
+    Для каждой задачи находит самое позднее окончание среди всех ее предшественников
+    (транзитивно по цепочкам Finish-to-Start)
+    
+    Граф обходится в топологическом порядке (алгоритм Кана). Для задач, попавших
+    в цикл или зависящих от него, учитываются только прямые предшественники.
     
     Returns:
-        (improvement_percentage, hours_removed, hours_added, is_valid)
+        Словарь {task_id: порядковый номер дня} для задач с предшественниками
     """
-    new_start = task_start + timedelta(days=shift_days)
-    new_end = task_end + timedelta(days=shift_days)
-    
-    # Точный расчет: сколько часов задачи было в исходной неделе
-    source_overlap_start = max(task_start, source_week['start'])
-    source_overlap_end = min(task_end, source_week['end'])
-    
-    if source_overlap_start > source_overlap_end:
-        return 0, 0, 0, False
-    
-    task_duration_days = (task_end - task_start).days + 1
-    source_overlap_days = (source_overlap_end - source_overlap_start).days + 1
-    source_proportion = source_overlap_days / task_duration_days if task_duration_days > 0 else 0
-    hours_removed_from_source = task_hours * source_proportion
-    
-    # Точный расчет: сколько часов задачи будет в целевой неделе
-    target_overlap_start = max(new_start, target_week['start'])
-    target_overlap_end = min(new_end, target_week['end'])
-    
-    if target_overlap_start > target_overlap_end:
-        return 0, 0, 0, False
-    
-    target_overlap_days = (target_overlap_end - target_overlap_start).days + 1
-    target_proportion = target_overlap_days / task_duration_days if task_duration_days > 0 else 0
-    hours_added_to_target = task_hours * target_proportion
-    
-    # Рассчитать новую загрузку
-    new_source_hours = source_week['hours'] - hours_removed_from_source
-    new_source_percentage = (new_source_hours / source_week['capacity']) * 100 if source_week['capacity'] > 0 else 0
-    
-    new_target_hours = target_week['hours'] + hours_added_to_target
-    new_target_percentage = (new_target_hours / target_week['capacity']) * 100 if target_week['capacity'] > 0 else 0
-    
-    # Проверка валидности
-    is_valid = (new_source_percentage < source_week['percentage'] and 
-                new_target_percentage <= 100)
-    
-    improvement = source_week['percentage'] - new_source_percentage if is_valid else 0
-    
-    return improvement, hours_removed_from_source, hours_added_to_target, is_valid
+    finish_ord = {}
+    for task_id, task in task_dict.items():
+        finish_dt = parser._parse_date(task['finish']) if task.get('finish') else None
+        if finish_dt:
+            finish_ord[task_id] = _to_ord(finish_dt)
+    
+    preds = {
+        task_id: [p for p in (task.get('predecessors') or []) if p in task_dict]
+        for task_id, task in task_dict.items()
+    }
+    successors = {task_id: [] for task_id in task_dict}
+    indegree = {task_id: len(pred_ids) for task_id, pred_ids in preds.items()}
+    for task_id, pred_ids in preds.items():
+        for pred_id in pred_ids:
+            successors[pred_id].append(task_id)
+    
+    crit_finish_ord = {}
+    # Самое позднее окончание цепочки, заканчивающейся задачей (включая ее саму)
+    chain_finish_ord = {}
+    queue = deque(task_id for task_id, degree in indegree.items() if degree == 0)
+    while queue:
+        task_id = queue.popleft()
+        pred_finishes = [chain_finish_ord[p] for p in preds[task_id] if p in chain_finish_ord]
+        if pred_finishes:
+            crit_finish_ord[task_id] = max(pred_finishes)
+        own_finishes = pred_finishes + ([finish_ord[task_id]] if task_id in finish_ord else [])
+        if own_finishes:
+            chain_finish_ord[task_id] = max(own_finishes)
+        for succ_id in successors[task_id]:
+            indegree[succ_id] -= 1
+            if indegree[succ_id] == 0:
+                queue.append(succ_id)
+    
+    # Циклические зависимости: только прямые предшественники
+    for task_id, degree in indegree.items():
+        if degree > 0:
+            pred_finishes = [finish_ord[p] for p in preds[task_id] if p in finish_ord]
+            if pred_finishes:
+                crit_finish_ord[task_id] = max(pred_finishes)
+    
+    return crit_finish_ord
 
 
-def binary_search_optimal_shift(task_info, source_week, target_week_idx, weekly_loads, 
-                                  weeks_with_dates, parser, task_dict, max_shift, week_idx):
+def evaluate_shift_grid(task_start_ord, task_end_ord, task_hours, source_idx, candidate_idx,
+                        week_start_ords, week_end_ords, week_hours, week_caps, week_pcts, max_shift,
+                        min_shift=1):
     """
-    Бинарный поиск оптимального сдвига вместо линейного перебора
+    Оценивает все пары (целевая неделя, сдвиг) одной векторной операцией NumPy
+    
+    Для каждой пары считаются часы, уходящие из исходной недели (с учетом части задачи,
+    оставшейся в ней после сдвига), и часы, попадающие в целевую неделю, пропорционально
+    дням перекрытия. Пара допустима, если загрузка исходной недели снижается, а целевой
+    не превышает 100%. Сетка candidate_idx × [min_shift, max_shift] считается сразу:
+    строки - целевые недели, столбцы - сдвиги. Даты задаются порядковыми номерами дней
+    (см. _to_ord).
     
     Returns:
-        (best_shift, best_improvement) or (None, 0)
+        (target_week_idx, shift, improvement, hours_removed, hours_added)
+        или (None, None, 0, 0, 0)
     """
-    task = task_info['task']
-    task_start = task_info['start']
-    task_end = task_info['end']
-    task_hours = task_info['hours']
-    
-    if target_week_idx >= len(weekly_loads) or target_week_idx == week_idx:
-        return None, 0
-    
-    target_week = weekly_loads[target_week_idx]
-    
-    # Проверка зависимостей для граничного случая
-    new_start_max = task_start + timedelta(days=max_shift)
-    new_end_max = task_end + timedelta(days=max_shift)
-    is_valid_max, _ = check_task_dependencies(task['id'], new_start_max, new_end_max, parser, task_dict)
-    
-    if not is_valid_max:
-        # Если максимальный сдвиг нарушает зависимости, ищем меньший
-        left, right = 1, max_shift
-        best_shift = None
-        best_improvement = 0
-        
-        while left <= right:
-            mid = (left + right) // 2
-            new_start = task_start + timedelta(days=mid)
-            new_end = task_end + timedelta(days=mid)
-            
-            is_valid, _ = check_task_dependencies(task['id'], new_start, new_end, parser, task_dict)
-            improvement, _, _, valid_shift = calculate_precise_improvement(
-                task_info, source_week, target_week, mid,
-                task_start, task_end, task_hours, weeks_with_dates, weekly_loads
-            )
-            
-            if is_valid and valid_shift and improvement > best_improvement:
-                best_shift = mid
-                best_improvement = improvement
-                # Пробуем больший сдвиг
-                left = mid + 1
-            else:
-                # Меньший сдвиг
-                right = mid - 1
-        
-        return best_shift, best_improvement
-    
-    # Если зависимости не нарушаются, ищем оптимальный сдвиг бинарным поиском
-    left, right = 1, max_shift
-    best_shift = None
-    best_improvement = 0
-    
-    while left <= right:
-        mid = (left + right) // 2
-        
-        improvement, _, _, is_valid = calculate_precise_improvement(
-            task_info, source_week, target_week, mid,
-            task_start, task_end, task_hours, weeks_with_dates, weekly_loads
-        )
-        
-        if is_valid and improvement > best_improvement:
-            best_shift = mid
-            best_improvement = improvement
-        
-        # Если улучшение растет, пробуем больший сдвиг, иначе меньший
-        if mid < max_shift:
-            next_improvement, _, _, next_valid = calculate_precise_improvement(
-                task_info, source_week, target_week, mid + 1,
-                task_start, task_end, task_hours, weeks_with_dates, weekly_loads
-            )
-            if next_valid and next_improvement > improvement:
-                left = mid + 1
-            else:
-                right = mid - 1
-        else:
-            break
-    
-    return best_shift, best_improvement
+    task_duration_days = task_end_ord - task_start_ord + 1
+    min_shift = max(1, min_shift)
+    if max_shift < min_shift or len(candidate_idx) == 0 or task_duration_days <= 0:
+        return None, None, 0, 0, 0
+    
+    shifts = np.arange(min_shift, max_shift + 1)
+    new_starts = task_start_ord + shifts
+    new_ends = task_end_ord + shifts
+    
+    # Исходная неделя: вектор (D,) по сдвигам
+    source_start = week_start_ords[source_idx]
+    source_end = week_end_ords[source_idx]
+    source_overlap_days = min(task_end_ord, source_end) - max(task_start_ord, source_start) + 1
+    if source_overlap_days <= 0:
+        return None, None, 0, 0, 0
+    
+    remaining_overlap_days = np.clip(
+        np.minimum(new_ends, source_end) - np.maximum(new_starts, source_start) + 1, 0, None
+    )
+    hours_removed = task_hours * (source_overlap_days - remaining_overlap_days) / task_duration_days
+    
+    source_capacity = week_caps[source_idx]
+    if source_capacity > 0:
+        new_source_pct = (week_hours[source_idx] - hours_removed) / source_capacity * 100
+    else:
+        new_source_pct = np.zeros(len(shifts))
+    improvement = week_pcts[source_idx] - new_source_pct
+    
+    # Целевые недели: матрица (W, D)
+    target_starts = week_start_ords[candidate_idx][:, None]
+    target_ends = week_end_ords[candidate_idx][:, None]
+    target_overlap_days = (np.minimum(new_ends[None, :], target_ends)
+                           - np.maximum(new_starts[None, :], target_starts) + 1)
+    hours_added = task_hours * target_overlap_days / task_duration_days
+    
+    target_caps = week_caps[candidate_idx][:, None]
+    safe_caps = np.where(target_caps > 0, target_caps, 1)
+    new_target_pct = np.where(
+        target_caps > 0, (week_hours[candidate_idx][:, None] + hours_added) / safe_caps * 100, 0
+    )
+    
+    valid = (target_overlap_days > 0) & (improvement[None, :] > 0) & (new_target_pct <= 100)
+    if not valid.any():
+        return None, None, 0, 0, 0
+    
+    # При равном улучшении argmax берёт самую раннюю неделю и наименьший сдвиг
+    scores = np.where(valid, improvement[None, :], -np.inf)
+    best_w, best_d = np.unravel_index(scores.argmax(), scores.shape)
+    return (int(candidate_idx[best_w]), int(shifts[best_d]), float(improvement[best_d]),
+            float(hours_removed[best_d]), float(hours_added[best_w, best_d]))
 
 
 def optimize_with_task_shifting(parser, settings, date_range_start=None, date_range_end=None, selected_resources=None):
@@ -187,107 +153,124 @@ def optimize_with_task_shifting(parser, settings, date_range_start=None, date_ra
             {
                 'max_shift_days': int,  # Максимальное смещение задач в днях
                 'target_load': float,   # Целевая загрузка (70-100%)
-                'mode': 'balance'       # Режим: 'balance' или 'minimize_peaks'
+                'mode': 'balance',      # Режим: 'balance' или 'minimize_peaks'
+                'top_k': int            # Сколько лучших рекомендаций вернуть (по умолчанию 50)
             }
         date_range_start: Начало анализируемого периода (datetime.date or None)
         date_range_end: Конец анализируемого периода (datetime.date or None)
         selected_resources: Список выбранных ресурсов для оптимизации (list or None)
+    
+    Returns:
+        Не более top_k рекомендаций, отсортированных по убыванию улучшения
     """
     max_shift = settings.get('max_shift_days', 14)
     target_load = settings.get('target_load', 85)
     mode = settings.get('mode', 'balance')
+    top_k = settings.get('top_k', 50)
     
     # Получить временную загрузку с учётом диапазона
     timeline_data = parser.get_timeline_workload(date_range_start, date_range_end)
     # Создать task_dict по ID только для зависимостей (не для связывания назначений)
     task_dict = {t['id']: t for t in parser.tasks}
+    # Индекс задач по имени и датам для связывания назначений без прохода по всем задачам
+    task_index = build_task_index(parser.tasks)
+    
+    # Самое позднее окончание всех предшественников каждой задачи (порядковый день)
+    crit_finish_ord = build_critical_finish_index(parser, task_dict)
+    
+    # Построить сетку недель (одна на все ресурсы)
+    # КРИТИЧНО: Использовать тот же диапазон что и в get_timeline_workload()
+    if date_range_start and date_range_end:
+        range_start_dt = date_range_start
+        range_end_dt = date_range_end
+    else:
+        parsed_starts = [parser._parse_date(t['start']) for t in parser.tasks if t['start']]
+        parsed_ends = [parser._parse_date(t['finish']) for t in parser.tasks if t['finish']]
+        range_start_dt = min((d for d in parsed_starts if d), default=None)
+        range_end_dt = max((d for d in parsed_ends if d), default=None)
+    
+    if not range_start_dt or not range_end_dt:
+        return []
+    
+    # Границы недель - порядковые номера дней
+    range_start_ord = _to_ord(range_start_dt)
+    range_end_ord = _to_ord(range_end_dt)
+    all_week_start_ords = np.arange(range_start_ord, range_end_ord + 1, 7, dtype=np.int64)
+    all_week_end_ords = np.minimum(all_week_start_ords + 6, range_end_ord)
+    
+    # Индексы ресурсов и назначений (один раз на запуск)
+    resource_by_name = {}
+    for r in parser.resources:
+        resource_by_name.setdefault(r['name'], r)
+    
+    # Для MultiProjectParser использовать специальный метод
+    # Проверяем наличие атрибута 'parsers' вместо isinstance для избежания циклических импортов
+    use_multi = hasattr(parser, 'parsers') and hasattr(parser, 'get_assignments_for_resource')
+    assignments_by_resource = {}
+    if not use_multi:
+        for a in parser.assignments:
+            assignments_by_resource.setdefault(a.get('resource_name'), []).append(a)
     
     # Найти перегруженные периоды для каждого ресурса
-    optimization_suggestions = []
+    # Min-куча (улучшение, порядковый номер, рекомендация) хранит только top_k лучших
+    suggestions_heap = []
+    suggestion_counter = 0
     
     for resource_name, weekly_loads in timeline_data.items():
         # Фильтрация по выбранным ресурсам
         if selected_resources and resource_name not in selected_resources:
             continue
-        # Найти перегруженные и недозагруженные недели
-        overloaded_weeks = {}
-        underloaded_weeks = {}
+        # Показатели загрузки в виде параллельных массивов (один раз на ресурс)
+        week_hours = np.array([w['hours'] for w in weekly_loads], dtype=float)
+        week_caps = np.array([w['capacity'] for w in weekly_loads], dtype=float)
+        week_pcts = np.array([w['percentage'] for w in weekly_loads], dtype=float)
         
-        for i, week_data in enumerate(weekly_loads):
-            if week_data['percentage'] > 100:
-                overloaded_weeks[i] = week_data
-            elif week_data['percentage'] < target_load:
-                underloaded_weeks[i] = week_data
+        # Найти перегруженные и недозагруженные недели
+        overloaded_idx = np.nonzero(week_pcts > 100)[0]
+        underloaded_mask = week_pcts < target_load
         
-        if not overloaded_weeks:
+        if len(overloaded_idx) == 0:
             continue
         
         # Найти задачи этого ресурса
-        resource = next((r for r in parser.resources if r['name'] == resource_name), None)
+        resource = resource_by_name.get(resource_name)
         if not resource:
             continue
         
-        # Для MultiProjectParser использовать специальный метод
-        # Проверяем наличие атрибута 'parsers' вместо isinstance для избежания циклических импортов
-        if hasattr(parser, 'parsers') and hasattr(parser, 'get_assignments_for_resource'):
+        if use_multi:
             resource_assignments = parser.get_assignments_for_resource(resource_name)
         else:
-            resource_assignments = [a for a in parser.assignments if a.get('resource_name') == resource_name]
+            resource_assignments = assignments_by_resource.get(resource_name, [])
         
-        # Построить карту недель для быстрого поиска (один раз на ресурс)
-        # КРИТИЧНО: Использовать тот же диапазон что и в get_timeline_workload()
-        project_start = None
-        project_end = None
-        for task_item in parser.tasks:
-            if task_item['start']:
-                ts = parser._parse_date(task_item['start'])
-                if ts and (project_start is None or ts < project_start):
-                    project_start = ts
-            if task_item['finish']:
-                te = parser._parse_date(task_item['finish'])
-                if te and (project_end is None or te > project_end):
-                    project_end = te
+        # Часы назначений разбираются один раз на ресурс, а не в каждой перегруженной неделе
+        assignment_hours = parse_work_hours_batch([a.get('work') for a in resource_assignments])
         
-        # Использовать выбранный диапазон или весь проект
-        if date_range_start and date_range_end:
-            from datetime import datetime as dt_class
-            range_start_dt = dt_class.combine(date_range_start, dt_class.min.time())
-            range_end_dt = dt_class.combine(date_range_end, dt_class.max.time())
-        else:
-            range_start_dt = project_start
-            range_end_dt = project_end
-        
-        if not range_start_dt or not range_end_dt:
-            continue
-            
-        current_date = range_start_dt
-        weeks_with_dates = []
-        while current_date <= range_end_dt:
-            week_end = current_date + timedelta(days=6)
-            weeks_with_dates.append({
-                'start': current_date,
-                'end': min(week_end, range_end_dt),
-                'index': len(weeks_with_dates)
-            })
-            current_date = week_end + timedelta(days=1)
+        # Согласовать сетку недель с загрузкой ресурса
+        n_weeks = min(len(all_week_start_ords), len(weekly_loads))
+        week_start_ords = all_week_start_ords[:n_weeks]
+        week_end_ords = all_week_end_ords[:n_weeks]
+        week_hours = week_hours[:n_weeks]
+        week_caps = week_caps[:n_weeks]
+        week_pcts = week_pcts[:n_weeks]
+        underloaded_mask = underloaded_mask[:n_weeks]
+        week_positions = np.arange(n_weeks)
         
         # Для каждой перегруженной недели найти задачи, которые можно сдвинуть
-        for week_idx, week_data in overloaded_weeks.items():
-            excess_hours = week_data['hours'] - week_data['capacity']
+        for week_idx in overloaded_idx[overloaded_idx < n_weeks]:
+            week_idx = int(week_idx)
+            week_data = weekly_loads[week_idx]
+            excess_hours = week_hours[week_idx] - week_caps[week_idx]
             
             # Получить временные границы текущей недели
-            if week_idx >= len(weeks_with_dates):
-                continue
-            current_week_info = weeks_with_dates[week_idx]
-            week_start = current_week_info['start']
-            week_end = current_week_info['end']
+            week_start = int(week_start_ords[week_idx])
+            week_end = int(week_end_ords[week_idx])
             
             # Найти задачи, пересекающиеся с этой неделей
             tasks_in_week = []
-            for assignment in resource_assignments:
+            for assignment, task_hours in zip(resource_assignments, assignment_hours):
                 # Поиск задачи по комбинации имени и дат
-                task = find_task_by_name_and_dates(
-                    parser.tasks,
+                task = find_task_in_index(
+                    task_index,
                     assignment.get('task_name'),
                     assignment.get('task_start'),
                     assignment.get('task_finish')
@@ -295,22 +278,23 @@ def optimize_with_task_shifting(parser, settings, date_range_start=None, date_ra
                 if not task or not task.get('start') or not task.get('finish'):
                     continue
                 
-                task_start = parser._parse_date(task['start'])
-                task_end = parser._parse_date(task['finish'])
-                if not task_start or not task_end:
+                task_start_dt = parser._parse_date(task['start'])
+                task_end_dt = parser._parse_date(task['finish'])
+                if not task_start_dt or not task_end_dt:
                     continue
+                task_start = _to_ord(task_start_dt)
+                task_end = _to_ord(task_end_dt)
                 
                 # КРИТИЧНО: Проверить, что задача пересекается с текущей неделей
                 if task_end < week_start or task_start > week_end:
                     continue  # Задача не пересекается с этой неделей
                 
-                task_hours = parser._parse_work_hours(assignment['work'])
                 tasks_in_week.append({
                     'task': task,
                     'assignment': assignment,
                     'start': task_start,
                     'end': task_end,
-                    'hours': task_hours
+                    'hours': float(task_hours)
                 })
             
             # Приоритизация задач: сортировка по влиянию на перегрузку
@@ -326,13 +310,13 @@ def optimize_with_task_shifting(parser, settings, date_range_start=None, date_ra
                 if overlap_start > overlap_end:
                     return 0
                 
-                task_duration_days = (task_end - task_start).days + 1
-                overlap_days = (overlap_end - overlap_start).days + 1
+                task_duration_days = task_end - task_start + 1
+                overlap_days = overlap_end - overlap_start + 1
                 proportion = overlap_days / task_duration_days if task_duration_days > 0 else 0
                 hours_in_week = task_info['hours'] * proportion
                 
                 # Влияние = часы в неделе * уровень перегрузки
-                impact = hours_in_week * week_data['percentage']
+                impact = hours_in_week * week_pcts[week_idx]
                 return impact
             
             # Сортировка по влиянию (наибольшее влияние первым)
@@ -349,92 +333,69 @@ def optimize_with_task_shifting(parser, settings, date_range_start=None, date_ra
                 best_improvement = 0
                 best_target_week_idx = None
                 
-                # Найти подходящие целевые недели (недозагруженные)
-                # Принимаем все недозагруженные недели как кандидаты
-                # Бинарный поиск проверит, может ли задача достичь недели с любым сдвигом до max_shift
-                candidate_target_weeks = []
-                for i, target_week in enumerate(weekly_loads):
-                    if i != week_idx and target_week['percentage'] < target_load:
-                        candidate_target_weeks.append(i)
+                # Найти подходящие целевые недели: недозагруженные и достижимые
+                # сдвигом в пределах [1, max_shift] дней
+                min_reachable_ord = task_start + 1
+                max_reachable_ord = task_end + max_shift
+                candidate_target_weeks = np.nonzero(
+                    underloaded_mask
+                    & (week_end_ords >= min_reachable_ord)
+                    & (week_start_ords <= max_reachable_ord)
+                    & (week_positions != week_idx)
+                )[0]
+                if len(candidate_target_weeks) == 0:
+                    continue
+                
+                # Зависимости Finish-to-Start: задача должна начаться после окончания
+                # всех предшественников, поэтому они задают минимальный допустимый сдвиг
+                min_valid_shift = 1
+                if task['id'] in crit_finish_ord:
+                    min_valid_shift = max(1, crit_finish_ord[task['id']] - task_start + 1)
                 
-                # Для каждой целевой недели найти оптимальный сдвиг бинарным поиском
-                for target_week_idx in candidate_target_weeks:
-                    if target_week_idx >= len(weekly_loads):
-                        continue
-                    
-                    target_week = weekly_loads[target_week_idx]
-                    
-                    # Бинарный поиск оптимального сдвига
-                    shift, improvement = binary_search_optimal_shift(
-                        task_info, week_data, target_week_idx, weekly_loads,
-                        weeks_with_dates, parser, task_dict, max_shift, week_idx
-                    )
-                    
-                    if shift and improvement > best_improvement:
-                        # Проверить зависимости для найденного сдвига
-                        new_start_check = task_start + timedelta(days=shift)
-                        new_end_check = task_end + timedelta(days=shift)
-                        is_valid, blocking = check_task_dependencies(
-                            task['id'], new_start_check, new_end_check, parser, task_dict
-                        )
-                        
-                        if is_valid:
-                            best_improvement = improvement
-                            best_shift = shift
-                            best_target_week_idx = target_week_idx
-                        elif shift > 1:
-                            # Если зависимости нарушены, попробовать меньший сдвиг
-                            for smaller_shift in range(1, shift):
-                                new_start_small = task_start + timedelta(days=smaller_shift)
-                                new_end_small = task_end + timedelta(days=smaller_shift)
-                                is_valid_small, _ = check_task_dependencies(
-                                    task['id'], new_start_small, new_end_small, parser, task_dict
-                                )
-                                if is_valid_small:
-                                    improvement_small, _, _, valid = calculate_precise_improvement(
-                                        task_info, week_data, target_week, smaller_shift,
-                                        task_start, task_end, task_hours, weeks_with_dates, weekly_loads
-                                    )
-                                    if valid and improvement_small > best_improvement:
-                                        best_improvement = improvement_small
-                                        best_shift = smaller_shift
-                                        best_target_week_idx = target_week_idx
-                                        break
+                # Оценить все допустимые пары (целевая неделя, сдвиг) за один проход
+                target_week_idx, shift, improvement, hours_removed, hours_added = evaluate_shift_grid(
+                    task_start, task_end, task_hours, week_idx,
+                    candidate_target_weeks, week_start_ords, week_end_ords,
+                    week_hours, week_caps, week_pcts, max_shift, min_valid_shift
+                )
+                
+                if shift:
+                    best_improvement = improvement
+                    best_shift = shift
+                    best_target_week_idx = target_week_idx
                 
                 # Если нашли хороший сдвиг, добавляем рекомендацию
                 if best_shift and best_target_week_idx is not None:
-                    new_start = task_start + timedelta(days=best_shift)
-                    new_end = task_end + timedelta(days=best_shift)
-                    
-                    # Точный расчет для финальной рекомендации
-                    target_week_final = weekly_loads[best_target_week_idx]
-                    _, hours_removed, hours_added, _ = calculate_precise_improvement(
-                        task_info, week_data, target_week_final, best_shift,
-                        task_start, task_end, task_hours, weeks_with_dates, weekly_loads
-                    )
+                    new_start = task_start + best_shift
+                    new_end = task_end + best_shift
                     
-                    optimization_suggestions.append({
+                    suggestion = {
                         'type': 'shift_task',
                         'resource': resource_name,
                         'task_name': task['name'],
                         'task_hours': task_hours,
-                        'original_start': task_start.strftime('%Y-%m-%d'),
-                        'original_end': task_end.strftime('%Y-%m-%d'),
-                        'suggested_start': new_start.strftime('%Y-%m-%d'),
-                        'suggested_end': new_end.strftime('%Y-%m-%d'),
+                        'original_start': _from_ord(task_start).strftime('%Y-%m-%d'),
+                        'original_end': _from_ord(task_end).strftime('%Y-%m-%d'),
+                        'suggested_start': _from_ord(new_start).strftime('%Y-%m-%d'),
+                        'suggested_end': _from_ord(new_end).strftime('%Y-%m-%d'),
                         'shift_days': best_shift,
                         'improvement': f'{best_improvement:.1f}%',
                         'hours_freed': f'{hours_removed:.1f}',
                         'hours_added': f'{hours_added:.1f}',
                         'reason': f'Снизить перегрузку на {hours_removed:.1f}ч в неделю {week_data["week"]} (точный расчет)',
-                        'priority': 'Высокий' if week_data['percentage'] > 120 else 'Средний'
-                    })
+                        'priority': 'Высокий' if week_pcts[week_idx] > 120 else 'Средний'
+                    }
+                    # Более ранние рекомендации выигрывают при равном улучшении
+                    suggestion_counter += 1
+                    heapq.heappush(suggestions_heap, (best_improvement, -suggestion_counter, suggestion))
+                    if len(suggestions_heap) > top_k:
+                        heapq.heappop(suggestions_heap)
                     
                     # Для режима balance берём только одну задачу на неделю
                     if mode == 'balance':
                         break
     
-    return optimization_suggestions
+    return [item[2] for item in sorted(suggestions_heap, key=lambda item: item[:2], reverse=True)]
 
 
 def render_intelligent_optimization(selected_resources):
@@ -482,7 +443,8 @@ def render_intelligent_optimization(selected_resources):
                 optimization_settings = {
                     'max_shift_days': max_shift_days,
                     'target_load': target_load,
-                    'mode': opt_mode
+                    'mode': opt_mode,
+                    'top_k': 50
                 }
                 st.session_state.optimization_results = optimize_with_task_shifting(
                     st.session_state.parser, 
@@ -504,6 +466,8 @@ def render_intelligent_optimization(selected_resources):
         
         opt_results = st.session_state.optimization_results
         if opt_results:
+            # Собрать все карточки в один HTML-блок: один вызов st.markdown вместо десяти
+            html_parts = []
             for i, suggestion in enumerate(opt_results[:10], 1):
                 priority_color = {
                     'Высокий': '#FF4B4B',
@@ -512,7 +476,7 @@ def render_intelligent_optimization(selected_resources):
                 }.get(suggestion.get('priority', 'Низкий'), '#107C10')
                 
                 improvement_info = f"<b>Улучшение:</b> {suggestion['improvement']}<br/>" if 'improvement' in suggestion else ""
-                st.markdown(f"""
+                html_parts.append(f"""
                 <div style='background-color: white; padding: 15px; border-radius: 8px; 
                             margin: 10px 0; border-left: 4px solid {priority_color}'>
                     <b>{i}. Сдвинуть задачу "{suggestion['task_name']}"</b> 
@@ -528,7 +492,8 @@ def render_intelligent_optimization(selected_resources):
                     {improvement_info}
                     <b>Причина:</b> {suggestion['reason']}
                 </div>
-                """, unsafe_allow_html=True)
+                """)
+            st.markdown("\n".join(html_parts), unsafe_allow_html=True)
         else:
             st.success("✓ Распределение оптимально, смещения не требуются!")
 
@@ -3,10 +3,14 @@ Material Design 3 Theme Components
 Современный дизайн на основе Material Design 3 с палитрой из #0078D4
 """
 
+import re
+from types import MappingProxyType
+
 import streamlit as st
 
 # MD3 цветовая палитра, сгенерированная из seed color #0078D4
-MD3_COLORS = {
+# Только для чтения: на ней построены CSS и кэшируемые компоненты
+MD3_COLORS = MappingProxyType({
     # Light theme colors
     'primary': '#005EB0',
     'on_primary': '#FFFFFF',
@@ -37,10 +41,10 @@ MD3_COLORS = {
     
     'outline': '#73777F',
     'outline_variant': '#C3C6CF',
-}
+})
 
-def get_md3_css():
-    """Возвращает CSS стили для темы Material Design 3"""
+def _build_css(colors):
+    """Собирает CSS стили темы Material Design 3 для заданной палитры"""
     return f"""
     <style>
         /* Используем системные шрифты для работы в .exe (без внешних зависимостей) */
@@ -48,35 +52,35 @@ def get_md3_css():
         
         /* MD3 Color Variables */
         :root {{
-            --md-sys-color-primary: {MD3_COLORS['primary']};
-            --md-sys-color-on-primary: {MD3_COLORS['on_primary']};
-            --md-sys-color-primary-container: {MD3_COLORS['primary_container']};
-            --md-sys-color-on-primary-container: {MD3_COLORS['on_primary_container']};
+            --md-sys-color-primary: {colors['primary']};
+            --md-sys-color-on-primary: {colors['on_primary']};
+            --md-sys-color-primary-container: {colors['primary_container']};
+            --md-sys-color-on-primary-container: {colors['on_primary_container']};
             
-            --md-sys-color-secondary: {MD3_COLORS['secondary']};
-            --md-sys-color-on-secondary: {MD3_COLORS['on_secondary']};
-            --md-sys-color-secondary-container: {MD3_COLORS['secondary_container']};
-            --md-sys-color-on-secondary-container: {MD3_COLORS['on_secondary_container']};
+            --md-sys-color-secondary: {colors['secondary']};
+            --md-sys-color-on-secondary: {colors['on_secondary']};
+            --md-sys-color-secondary-container: {colors['secondary_container']};
+            --md-sys-color-on-secondary-container: {colors['on_secondary_container']};
             
-            --md-sys-color-tertiary: {MD3_COLORS['tertiary']};
-            --md-sys-color-on-tertiary: {MD3_COLORS['on_tertiary']};
-            --md-sys-color-tertiary-container: {MD3_COLORS['tertiary_container']};
-            --md-sys-color-on-tertiary-container: {MD3_COLORS['on_tertiary_container']};
+            --md-sys-color-tertiary: {colors['tertiary']};
+            --md-sys-color-on-tertiary: {colors['on_tertiary']};
+            --md-sys-color-tertiary-container: {colors['tertiary_container']};
+            --md-sys-color-on-tertiary-container: {colors['on_tertiary_container']};
             
-            --md-sys-color-error: {MD3_COLORS['error']};
-            --md-sys-color-on-error: {MD3_COLORS['on_error']};
-            --md-sys-color-error-container: {MD3_COLORS['error_container']};
-            --md-sys-color-on-error-container: {MD3_COLORS['on_error_container']};
+            --md-sys-color-error: {colors['error']};
+            --md-sys-color-on-error: {colors['on_error']};
+            --md-sys-color-error-container: {colors['error_container']};
+            --md-sys-color-on-error-container: {colors['on_error_container']};
             
-            --md-sys-color-background: {MD3_COLORS['background']};
-            --md-sys-color-on-background: {MD3_COLORS['on_background']};
-            --md-sys-color-surface: {MD3_COLORS['surface']};
-            --md-sys-color-on-surface: {MD3_COLORS['on_surface']};
-            --md-sys-color-surface-variant: {MD3_COLORS['surface_variant']};
-            --md-sys-color-on-surface-variant: {MD3_COLORS['on_surface_variant']};
+            --md-sys-color-background: {colors['background']};
+            --md-sys-color-on-background: {colors['on_background']};
+            --md-sys-color-surface: {colors['surface']};
+            --md-sys-color-on-surface: {colors['on_surface']};
+            --md-sys-color-surface-variant: {colors['surface_variant']};
+            --md-sys-color-on-surface-variant: {colors['on_surface_variant']};
             
-            --md-sys-color-outline: {MD3_COLORS['outline']};
-            --md-sys-color-outline-variant: {MD3_COLORS['outline_variant']};
+            --md-sys-color-outline: {colors['outline']};
+            --md-sys-color-outline-variant: {colors['outline_variant']};
         }}
         
         /* MD3 Typography Scale */
@@ -333,6 +337,27 @@ def get_md3_css():
     """
 
 
+# CSS не зависит от состояния приложения - собираем один раз при импорте,
+# а не на каждом перезапуске скрипта Streamlit
+_MD3_CSS = _build_css(MD3_COLORS)
+
+
+def get_md3_css():
+    """Возвращает CSS стили для темы Material Design 3"""
+    return _MD3_CSS
+
+
+# Статические фрагменты разметки карточек метрик и панели периода
+_CARD_PREFIX = '<div class="md3-card" style="text-align: center;"><div style="font-size: 32px; margin-bottom: 8px;">'
+_CARD_VALUE = '</div><div class="md3-display-small" style="color: var(--md-sys-color-on-surface); margin-bottom: 4px;">'
+_CARD_LABEL = '</div><div class="md3-label-medium" style="color: var(--md-sys-color-on-surface-variant);">'
+_CARD_DESC_PREFIX = '<div class="md3-body-small" style="color: var(--md-sys-color-on-surface-variant); margin-top: 4px;">'
+_DIV_END = '</div>'
+_PANEL_PREFIX = '<div style="margin: 24px 0;"><div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 16px;">'
+_PANEL_SUFFIX = '</div></div>'
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
 def md3_metric_card(icon, value, label, description=""):
     """
     Создает MD3 метрику в стиле Elevated Card
@@ -350,14 +375,15 @@ def md3_metric_card(icon, value, label, description=""):
     description = str(description) if description is not None else ""
     
     # Генерация HTML для описания
-    desc_html = f'<div class="md3-body-small" style="color: var(--md-sys-color-on-surface-variant); margin-top: 4px;">{description}</div>' if description else ''
+    desc_html = ''.join((_CARD_DESC_PREFIX, description, _DIV_END)) if description else ''
     
     # Генерация HTML для метрики (без лишних переносов строк)
-    html = f'<div class="md3-card" style="text-align: center;"><div style="font-size: 32px; margin-bottom: 8px;">{icon}</div><div class="md3-display-small" style="color: var(--md-sys-color-on-surface); margin-bottom: 4px;">{value}</div><div class="md3-label-medium" style="color: var(--md-sys-color-on-surface-variant);">{label}</div>{desc_html}</div>'
+    html = ''.join((_CARD_PREFIX, icon, _CARD_VALUE, value, _CARD_LABEL, label, _DIV_END, desc_html, _DIV_END))
     
     return html
 
 
+@st.cache_data(show_spinner=False, max_entries=256)
 def md3_info_panel(period_text, business_days, capacity_hours):
     """
     Создает панель управления периодом в MD3 стиле
@@ -383,7 +409,7 @@ def md3_info_panel(period_text, business_days, capacity_hours):
     card3 = md3_metric_card("⏱️", capacity_hours_str, "Ёмкость на чел.", description_str)
     
     # Собираем HTML без лишних переносов строк
-    html = f'<div style="margin: 24px 0;"><div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 16px;">{card1}{card2}{card3}</div></div>'
+    html = ''.join((_PANEL_PREFIX, card1, card2, card3, _PANEL_SUFFIX))
     
     return html
 
@@ -407,18 +433,16 @@ def md3_chip(text, closeable=False, chip_id=""):
     """
 
 
-def get_md3_table_style():
-    """Возвращает CSS для стилизации таблиц в MD3"""
-    return """
+_MD3_TABLE_CSS = """
     <style>
         /* MD3 Table Container */
-        .stDataFrame {{
+        .stDataFrame {
             border-radius: 12px;
             overflow: hidden;
-        }}
+        }
         
         /* Status colors - MD3 style */
-        .status-overloaded {{
+        .status-overloaded {
             background-color: var(--md-sys-color-error-container);
             color: var(--md-sys-color-on-error-container);
             padding: 6px 12px;
@@ -426,9 +450,9 @@ def get_md3_table_style():
             font-weight: 500;
             font-size: 12px;
             display: inline-block;
-        }}
+        }
         
-        .status-optimal {{
+        .status-optimal {
             background-color: var(--md-sys-color-primary-container);
             color: var(--md-sys-color-on-primary-container);
             padding: 6px 12px;
@@ -436,9 +460,9 @@ def get_md3_table_style():
             font-weight: 500;
             font-size: 12px;
             display: inline-block;
-        }}
+        }
         
-        .status-underutilized {{
+        .status-underutilized {
             background-color: var(--md-sys-color-tertiary-container);
             color: var(--md-sys-color-on-tertiary-container);
             padding: 6px 12px;
@@ -446,17 +470,54 @@ def get_md3_table_style():
             font-weight: 500;
             font-size: 12px;
             display: inline-block;
-        }}
+        }
     </style>
     """
 
 
+def get_md3_table_style():
+    """Возвращает CSS для стилизации таблиц в MD3"""
+    return _MD3_TABLE_CSS
+
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCT_SPACE_RE = re.compile(r'\s*([{};])\s*')
+
+
+def _minify_css(css):
+    """Убирает комментарии и лишние пробелы из CSS-разметки (без изменения правил)"""
+    css = _CSS_COMMENT_RE.sub('', css)
+    css = _CSS_SPACE_RE.sub(' ', css)
+    return _CSS_PUNCT_SPACE_RE.sub(r'\1', css).strip()
+
+
+# Полный набор стилей страницы: тема и таблицы одним элементом. Отправляется
+# браузеру на каждом перезапуске, поэтому сжимается один раз при импорте
+_MD3_PAGE_CSS = _minify_css(_MD3_CSS + _MD3_TABLE_CSS)
+
+
+def inject_md3_css():
+    """
+    Вставляет CSS темы и таблиц MD3 на страницу
+    
+    Вызывается на каждом прогоне скрипта: Streamlit удаляет элементы, не выведенные
+    при перезапуске, поэтому флаг "один раз за сессию" в st.session_state сбросил бы
+    стили после первого же взаимодействия.
+    """
+    st.markdown(_MD3_PAGE_CSS, unsafe_allow_html=True)
+
+
+# Цвета графиков строятся один раз при импорте; словарь только для чтения
+_CHART_COLORS = MappingProxyType({
+    'overloaded': MD3_COLORS['error'],
+    'optimal': MD3_COLORS['primary'],
+    'underutilized': MD3_COLORS['tertiary'],
+    'background': MD3_COLORS['surface'],
+    'text': MD3_COLORS['on_surface'],
+})
+
+
 def get_md3_chart_colors():
-    """Возвращает MD3 цвета для графиков Plotly"""
-    return {
-        'overloaded': MD3_COLORS['error'],
-        'optimal': MD3_COLORS['primary'],
-        'underutilized': MD3_COLORS['tertiary'],
-        'background': MD3_COLORS['surface'],
-        'text': MD3_COLORS['on_surface'],
-    }
+    """Возвращает MD3 цвета для графиков Plotly (только для чтения)"""
+    return _CHART_COLORS
@@ -3,7 +3,20 @@
 Содержит общие функции для парсинга и обработки данных
 """
 import logging
-from datetime import datetime, timedelta
+import re
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
 
 
 # ============================================================================
@@ -12,21 +25,22 @@ from datetime import datetime, timedelta
 
 def setup_logger(name):
     """
-    Настраивает и возвращает logger для модуля
+    Возвращает logger для модуля
+    
+    Обработчики не настраиваются: это делает точка входа приложения
+    (connect_cli.py, обработчик StreamlitHandler в app.py).
     
     Args:
         name: Имя модуля для logger
         
     Returns:
-        Настроенный logger
+        Logger модуля
     """
-    logger = logging.getLogger(name)
-    if not logger.handlers:
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(name)s - %(levelname)s - %(message)s'
-        )
-    return logger
+    return logging.getLogger(name)
+
+
+# Logger самого модуля: get_text и parse_work_hours вызываются тысячи раз за разбор XML
+logger = logging.getLogger(__name__)
 
 
 # ============================================================================
@@ -60,6 +74,69 @@ def make_tag(tag, namespace):
     return f'ns:{tag}' if namespace else tag
 
 
+# Кэш преобразования тегов в нотацию Кларка: (тег, uri) -> '{uri}Tag'
+_CLARK_TAGS = {}
+
+
+def clark_tag(tag, namespace):
+    """
+    Переводит тег с префиксом ('ns:Tag') в нотацию Кларка ('{uri}Tag')
+    
+    lxml сравнивает теги в нотации Кларка напрямую со значением element.tag,
+    без разбора префикса через словарь namespace при каждом поиске.
+    
+    Args:
+        tag: Тег с префиксом 'ns:', без префикса или уже в нотации Кларка
+        namespace: Словарь namespace или пустой словарь
+        
+    Returns:
+        Тег в нотации Кларка (или исходный тег, если namespace не задан)
+    """
+    uri = namespace.get('ns') if namespace else None
+    key = (tag, uri)
+    resolved = _CLARK_TAGS.get(key)
+    if resolved is None:
+        if uri and tag.startswith('ns:'):
+            resolved = f'{{{uri}}}{tag[3:]}'
+        else:
+            resolved = tag
+        _CLARK_TAGS[key] = resolved
+    return resolved
+
+
+def clark_tags(namespace, *tags):
+    """
+    Переводит набор базовых имен тегов в нотацию Кларка одним вызовом
+    
+    Предназначена для вычисления тегов полей один раз перед циклом разбора,
+    а не make_tag/clark_tag на каждый элемент.
+    
+    Args:
+        namespace: Словарь namespace или пустой словарь
+        *tags: Базовые имена тегов (без префикса)
+        
+    Returns:
+        Кортеж тегов в нотации Кларка в порядке аргументов
+    """
+    return tuple(clark_tag(make_tag(tag, namespace), namespace) for tag in tags)
+
+
+def iter_elements(root, tag, namespace):
+    """
+    Перебирает элементы в XML с учетом namespace, не собирая их в список
+    
+    Args:
+        root: Корневой элемент XML дерева
+        tag: Базовое имя тега (без префикса)
+        namespace: Словарь namespace или пустой словарь
+        
+    Returns:
+        Итератор по найденным элементам
+    """
+    # iterdescendants повторяет семантику './/tag': сам root не включается
+    return root.iterdescendants(clark_tag(make_tag(tag, namespace), namespace))
+
+
 def find_elements(root, tag, namespace):
     """
     Находит элементы в XML с учетом namespace
@@ -72,11 +149,7 @@ def find_elements(root, tag, namespace):
     Returns:
         Список найденных элементов
     """
-    tag_with_ns = make_tag(tag, namespace)
-    if namespace:
-        return root.findall(f'.//{tag_with_ns}', namespace)
-    else:
-        return root.findall(f'.//{tag}')
+    return list(iter_elements(root, tag, namespace))
 
 
 def get_text(element, tag, namespace, default=''):
@@ -92,33 +165,31 @@ def get_text(element, tag, namespace, default=''):
     Returns:
         Текст элемента или значение по умолчанию
     """
-    logger = logging.getLogger(__name__)
     try:
         # Проверить, является ли сам элемент искомым
         # Сравнить тег элемента с искомым тегом
+        # (element.text в lxml создает новую строку при каждом обращении - читается один раз)
         element_tag = element.tag
         if element_tag == tag:
             # Элемент сам является искомым
-            if element.text:
-                return element.text.strip() if element.text else default
-            return default
+            text = element.text
+            return text.strip() if text else default
         
         # Также проверить случай, когда тег может быть с namespace префиксом
         # Например, если tag = 'ns:Test', а element.tag = '{http://...}Test'
         if namespace and ':' in tag:
             tag_local = tag.split(':', 1)[1]  # Извлечь локальную часть после префикса
             if element_tag.endswith('}' + tag_local) or element_tag == tag_local:
-                if element.text:
-                    return element.text.strip() if element.text else default
-                return default
+                text = element.text
+                return text.strip() if text else default
         
-        # Поиск дочернего элемента
-        found = element.find(tag, namespace) if namespace else element.find(tag)
-        if found is not None and found.text:
-            return found.text.strip() if found.text else default
-        return default
+        # Поиск дочернего элемента: findtext возвращает None, если элемента нет,
+        # и '' для пустого элемента - оба случая дают default, как и раньше
+        text = element.findtext(clark_tag(tag, namespace))
+        return text.strip() if text else default
     except Exception as e:
-        logger.debug(f"Ошибка при извлечении текста из тега '{tag}': {e}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Ошибка при извлечении текста из тега '{tag}': {e}")
         return default
 
 
@@ -126,6 +197,7 @@ def get_text(element, tag, namespace, default=''):
 # Парсинг дат и времени
 # ============================================================================
 
+@lru_cache(maxsize=4096)
 def parse_date(date_string):
     """
     Парсит строку даты в datetime объект
@@ -134,6 +206,8 @@ def parse_date(date_string):
     - ISO 8601: '2024-01-15T10:30:00', '2024-01-15T10:30:00Z'
     - MS Project: '2024-01-15T10:30:00', '2024-01-15 10:30:00', '2024-01-15'
     
+    Результаты кэшируются: в XML одни и те же даты повторяются у многих задач.
+    
     Args:
         date_string: Строка с датой
         
@@ -144,26 +218,25 @@ def parse_date(date_string):
         return None
     
     try:
-        # Try ISO format first
+        # Самые частые формы MS Project ('2024-01-15T10:30:00', '2024-01-15 10:30:00',
+        # '2024-01-15') fromisoformat разбирает напрямую, без перебора форматов strptime
+        if len(date_string) in (10, 19):
+            return datetime.fromisoformat(date_string)
+        # Остальное - ISO 8601 с часовым поясом или долями секунды
         return datetime.fromisoformat(date_string.replace('Z', '+00:00'))
-    except:
-        try:
-            # Try common MS Project formats
-            for fmt in ['%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d']:
-                try:
-                    return datetime.strptime(date_string, fmt)
-                except:
-                    continue
-        except:
-            pass
-    
-    return None
+    except (TypeError, ValueError):
+        return None
 
 
 # ============================================================================
 # Парсинг рабочих часов (ISO-8601 duration)
 # ============================================================================
 
+# P[n]DT[n]H[n]M[n]S - все компоненты необязательны
+_DURATION_RE = re.compile(r'^P(?:([\d.]+)D)?(?:T(?:([\d.]+)H)?(?:([\d.]+)M)?(?:([\d.]+)S)?)?$')
+
+
+@lru_cache(maxsize=2048)
 def parse_work_hours(work_string):
     """
     Парсит рабочие часы из MS Project ISO-8601 duration формата
@@ -173,6 +246,8 @@ def parse_work_hours(work_string):
     - P2DT4H30M0S = 2 days (16 hours) + 4 hours + 30 minutes = 20.5 hours
     - P1D = 1 day = 8 hours (стандартный рабочий день)
     
+    Результаты кэшируются: типовые длительности (PT8H0M0S и т.п.) повторяются постоянно.
+    
     Args:
         work_string: Строка в формате ISO-8601 duration или число
         
@@ -185,52 +260,60 @@ def parse_work_hours(work_string):
     try:
         # MS Project uses ISO-8601 duration format: P[n]DT[n]H[n]M[n]S
         # P2DT4H30M0S = 2 days, 4 hours, 30 minutes
-        hours = 0
+        match = _DURATION_RE.match(work_string)
+        if match:
+            days, hours, minutes, seconds = match.groups()
+            # 1 день = 8 рабочих часов
+            return (float(days or 0) * 8 + float(hours or 0)
+                    + float(minutes or 0) / 60 + float(seconds or 0) / 3600)
         
-        if work_string.startswith('P'):
-            # Extract days (assuming 8-hour workdays)
-            if 'D' in work_string:
-                d_start = 1  # After 'P'
-                d_end = work_string.index('D')
-                days = float(work_string[d_start:d_end])
-                hours += days * 8  # 8-hour workday
-            
-            # Extract hours
-            if 'H' in work_string:
-                # Find start position (after 'T' or 'D')
-                if 'T' in work_string:
-                    h_start = work_string.index('T') + 1
-                else:
-                    h_start = work_string.index('D') + 1
-                h_end = work_string.index('H')
-                # Extract the number between start and 'H'
-                h_str = work_string[h_start:h_end]
-                # Remove any non-digit characters except '.'
-                h_str = ''.join(c for c in h_str if c.isdigit() or c == '.')
-                if h_str:
-                    hours += float(h_str)
-            
-            # Extract minutes
-            if 'M' in work_string and 'T' in work_string:
-                m_start = work_string.index('H') + 1 if 'H' in work_string else work_string.index('T') + 1
-                m_end = work_string.index('M')
-                m_str = work_string[m_start:m_end]
-                m_str = ''.join(c for c in m_str if c.isdigit() or c == '.')
-                if m_str:
-                    minutes = float(m_str)
-                    hours += minutes / 60
-            
-            return hours
-        else:
-            # Try to parse as number
-            return float(work_string)
-    except Exception as e:
+        # Try to parse as number
+        return float(work_string)
+    except (TypeError, ValueError) as e:
         # Fallback to 0 if parsing fails
-        logger = logging.getLogger(__name__)
-        logger.debug(f"Ошибка при парсинге рабочих часов '{work_string}': {e}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Ошибка при парсинге рабочих часов '{work_string}': {e}")
         return 0
 
 
+def parse_work_hours_batch(work_strings):
+    """
+    Векторный вариант parse_work_hours для списка длительностей
+    
+    Регулярное выражение применяется через Series.str.extract, арифметика
+    выполняется в numpy. Результат поэлементно совпадает с parse_work_hours.
+    Без pandas/numpy выполняется поэлементный вызов parse_work_hours.
+    
+    Args:
+        work_strings: Список (или Series) строк ISO-8601 duration или чисел
+        
+    Returns:
+        numpy.ndarray часов (float) той же длины; список, если numpy недоступен
+    """
+    if pd is None or np is None:
+        return [parse_work_hours(w) if isinstance(w, str) else 0 for w in work_strings]
+    
+    series = pd.Series(list(work_strings), dtype=object)
+    if series.empty:
+        return np.zeros(0)
+    
+    is_str = series.map(lambda w: isinstance(w, str) and w != '')
+    text = series.where(is_str, '')
+    parts = text.str.extract(_DURATION_RE.pattern)
+    matched = text.str.match(_DURATION_RE.pattern)
+    
+    # Компоненты, которые не преобразуются в число ('1.2.3'), обнуляют всю длительность
+    values = parts.apply(pd.to_numeric, errors='coerce')
+    bad = (parts.notna() & values.isna()).any(axis=1)
+    values = values.fillna(0.0).to_numpy(dtype=float)
+    hours = values[:, 0] * 8 + values[:, 1] + values[:, 2] / 60 + values[:, 3] / 3600
+    hours[bad.to_numpy()] = 0.0
+    
+    # Не-ISO строки разбираются как число, как в parse_work_hours
+    numeric = pd.to_numeric(text.where(~matched), errors='coerce').fillna(0.0).to_numpy(dtype=float)
+    return np.where(matched.to_numpy(), hours, numeric)
+
+
 # ============================================================================
 # Расчет рабочих дней и емкости
 # ============================================================================
@@ -256,14 +339,25 @@ def calculate_business_days(start_date, end_date):
     if isinstance(end_date, datetime):
         end_date = end_date.date()
     
-    business_days = 0
-    current_date = start_date
+    if end_date < start_date:
+        return 0
     
-    while current_date <= end_date:
+    if np is not None:
+        # busday_count считает дни в полуинтервале [start, end), поэтому +1 день
+        return int(np.busday_count(
+            np.datetime64(start_date, 'D'),
+            np.datetime64(end_date, 'D') + np.timedelta64(1, 'D')
+        ))
+    
+    # Без numpy: полные недели дают по 5 рабочих дней, остаток (< 7 дней) досчитываем
+    days = (end_date - start_date).days + 1
+    full_weeks, extra_days = divmod(days, 7)
+    business_days = full_weeks * 5
+    start_weekday = start_date.weekday()
+    for i in range(extra_days):
         # weekday(): 0=Monday, 1=Tuesday, ..., 6=Sunday
-        if current_date.weekday() < 5:  # 0-4 это пн-пт
+        if (start_weekday + i) % 7 < 5:  # 0-4 это пн-пт
             business_days += 1
-        current_date += timedelta(days=1)
     
     return business_days
 
@@ -300,44 +394,29 @@ def calculate_available_work_hours(date_start, date_end, default_hours=160):
     if not date_start or not date_end:
         return default_hours
     
-    # Проверить, что даты одинаковые (с учетом типа)
-    from datetime import datetime as dt_class, date as date_class
-    if isinstance(date_start, datetime) and isinstance(date_end, datetime):
-        if date_start.date() == date_end.date():
-            return 8
-    elif isinstance(date_start, date_class) and isinstance(date_end, date_class):
-        if date_start == date_end:
-            return 8
-    
-    # Конвертировать date в datetime для вычислений
+    # Целые календарные дни включительно: datetime приводится к дате
     if isinstance(date_start, datetime):
-        range_start_dt = date_start
-    else:
-        range_start_dt = dt_class.combine(date_start, dt_class.min.time())
-    
+        date_start = date_start.date()
     if isinstance(date_end, datetime):
-        range_end_dt = date_end
-    else:
-        range_end_dt = dt_class.combine(date_end, dt_class.max.time())
+        date_end = date_end.date()
     
-    range_duration = range_end_dt - range_start_dt
-    calendar_days = range_duration.total_seconds() / (24 * 3600)
+    calendar_days = (date_end - date_start).days + 1
     
-    if calendar_days <= 0:
+    if calendar_days <= 1:
         # Minimum: 1 workday = 8 hours
         return 8
-    else:
-        # Count workdays (approximate: 5/7 of calendar days are workdays)
-        workdays = calendar_days * (5.0 / 7.0)
-        # 8 hours per workday
-        return workdays * 8
+    
+    # Count workdays (approximate: 5/7 of calendar days are workdays)
+    workdays = calendar_days * (5.0 / 7.0)
+    # 8 hours per workday
+    return workdays * 8
 
 
 # ============================================================================
 # Поиск задач по комбинации ключей
 # ============================================================================
 
-def find_task_by_name_and_dates(tasks, task_name, task_start=None, task_finish=None):
+def find_task_by_name_and_dates(tasks, task_name, task_start=None, task_finish=None, task_index=None):
     """
     Находит задачу по комбинации имени и дат
     
@@ -346,10 +425,15 @@ def find_task_by_name_and_dates(tasks, task_name, task_start=None, task_finish=N
         task_name: Имя задачи
         task_start: Дата начала задачи (строка или None)
         task_finish: Дата окончания задачи (строка или None)
+        task_index: Индекс build_task_index(tasks); если передан, поиск выполняется
+            через find_task_in_index без прохода по списку задач
         
     Returns:
         Найденная задача (словарь) или None
     """
+    if task_index is not None:
+        return find_task_in_index(task_index, task_name, task_start, task_finish)
+    
     if not task_name:
         return None
     
@@ -411,3 +495,84 @@ def find_task_by_name_and_dates(tasks, task_name, task_start=None, task_finish=N
     
     return None
 
+
+def _to_lookup_date(value):
+    """Приводит дату (строку или date) к виду для сравнения при поиске задач"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        parsed = parse_date(value)
+        return parsed.date() if parsed else None
+    return value
+
+
+def build_task_index(tasks):
+    """
+    Строит индекс задач для поиска по комбинации имени и дат
+    
+    Даты каждой задачи разбираются один раз; дальше поиск через
+    find_task_in_index не требует прохода по всему списку задач.
+    
+    Args:
+        tasks: Список словарей с задачами
+        
+    Returns:
+        Словарь с ключами:
+        - 'by_key': {(имя, дата начала, дата окончания): задача}
+        - 'by_name': {имя: [(дата начала, дата окончания, задача), ...]}
+    """
+    by_key = {}
+    by_name = defaultdict(list)
+    
+    for task in tasks:
+        task_name = task.get('name', '')
+        task_start = _to_lookup_date(task.get('start', ''))
+        task_finish = _to_lookup_date(task.get('finish', ''))
+        # При совпадении ключей остается первая задача, как в find_task_by_name_and_dates
+        by_key.setdefault((task_name, task_start, task_finish), task)
+        by_name[task_name].append((task_start, task_finish, task))
+    
+    return {'by_key': by_key, 'by_name': dict(by_name)}
+
+
+def find_task_in_index(task_index, task_name, task_start=None, task_finish=None):
+    """
+    Находит задачу по комбинации имени и дат в индексе build_task_index
+    
+    Результат совпадает с find_task_by_name_and_dates для того же списка задач.
+    
+    Args:
+        task_index: Индекс, построенный build_task_index
+        task_name: Имя задачи
+        task_start: Дата начала задачи (строка или None)
+        task_finish: Дата окончания задачи (строка или None)
+        
+    Returns:
+        Найденная задача (словарь) или None
+    """
+    if not task_name:
+        return None
+    
+    normalized_start = _to_lookup_date(task_start)
+    normalized_finish = _to_lookup_date(task_finish)
+    
+    # Обе даты известны - прямой поиск по ключу
+    if normalized_start and normalized_finish:
+        return task_index['by_key'].get((task_name, normalized_start, normalized_finish))
+    
+    candidates = task_index['by_name'].get(task_name)
+    if not candidates:
+        return None
+    
+    # Если даты не указаны, вернуть первую найденную задачу с таким именем
+    if not normalized_start and not normalized_finish:
+        return candidates[0][2]
+    
+    for candidate_start, candidate_finish, task in candidates:
+        if normalized_start and candidate_start != normalized_start:
+            continue
+        if normalized_finish and candidate_finish != normalized_finish:
+            continue
+        return task
+    
+    return None
@@ -3,9 +3,16 @@
 Содержит функции для работы с данными сотрудников и UI компонент для управления персоналом
 """
 import streamlit as st
+import io
 import json
 import os
 import sys
+import tempfile
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 def get_base_path():
@@ -28,33 +35,115 @@ def get_base_path():
 # Определить базовый путь
 BASE_PATH = get_base_path()
 
+# Путь к файлу сотрудников и папке data/ (BASE_PATH не меняется во время работы)
+EMPLOYEES_FILE = os.path.join(BASE_PATH, "data", "employees.json")
+DATA_DIR = os.path.dirname(EMPLOYEES_FILE)
+_DATA_DIR_READY = False
+
+
+def _ensure_data_dir():
+    """Создает папку data/ при первом обращении; дальше без лишних системных вызовов"""
+    global _DATA_DIR_READY
+    if not _DATA_DIR_READY:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        _DATA_DIR_READY = True
+
+
+def _loads_employees(payload):
+    """Разбирает JSON сотрудников из байтов (orjson, иначе json)"""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload.decode('utf-8'))
+
+
+def _write_employees_file(employees_file, data):
+    """
+    Атомарно записывает данные сотрудников в UTF-8 JSON с отступом 2
+    
+    Запись идет в уникальный временный файл рядом с целевым через буфер 1 МБ
+    (сессии Streamlit в одном процессе могут сохранять одновременно), затем он
+    подменяет целевой через os.replace: при сбое старый файл остается целым.
+    orjson сериализует в байты одним вызовом; без него json.dump пишет в файл
+    потоком через TextIOWrapper, не собирая всю строку в памяти.
+    """
+    target_dir = os.path.dirname(employees_file)
+    fd, tmp_file = tempfile.mkstemp(dir=target_dir, prefix='.employees-', suffix='.tmp')
+    try:
+        with open(fd, 'wb', buffering=1024 * 1024) as raw:
+            if orjson is not None:
+                raw.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                text = io.TextIOWrapper(raw, encoding='utf-8')
+                json.dump(data, text, ensure_ascii=False, indent=2)
+                text.flush()
+                text.detach()
+            raw.flush()
+            os.fsync(raw.fileno())
+        # mkstemp создает файл с правами 0600 - сохранить права прежнего файла
+        try:
+            mode = os.stat(employees_file).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_file, mode)
+        os.replace(tmp_file, employees_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    
+    # Зафиксировать переименование на диске (POSIX; на Windows каталог так не открыть)
+    try:
+        dir_fd = os.open(target_dir, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+@st.cache_data(show_spinner=False)
+def _read_employees_file(employees_file, file_signature):
+    """
+    Читает и разбирает JSON-файл сотрудников
+    
+    file_signature (время изменения в наносекундах и размер) входит в ключ кэша:
+    изменение файла на диске приводит к повторному чтению. Размер ловит перезапись
+    в пределах одного тика mtime на файловых системах с грубым разрешением времени.
+    """
+    with open(employees_file, 'rb') as f:
+        return _loads_employees(f.read())
+
 
 def load_employees_data():
     """Загрузка данных сотрудников и групп из JSON-файла"""
     try:
-        # Получить актуальный путь (на случай изменения BASE_PATH)
-        employees_file = os.path.join(BASE_PATH, "data", "employees.json")
-        
         # Создать папку data/ если её нет
-        data_dir = os.path.dirname(employees_file)
-        os.makedirs(data_dir, exist_ok=True)
+        _ensure_data_dir()
+        
+        # Подпись файла (один stat); None - файла нет
+        try:
+            stat = os.stat(EMPLOYEES_FILE)
+            file_signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            file_signature = None
         
         # Если файл существует, загрузить данные
-        if os.path.exists(employees_file):
-            with open(employees_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return {
-                    'resources': data.get('resources', []),
-                    'resource_groups': data.get('resource_groups', {})
-                }
+        if file_signature is not None:
+            data = _read_employees_file(EMPLOYEES_FILE, file_signature)
+            return {
+                'resources': data.get('resources', []),
+                'resource_groups': data.get('resource_groups', {})
+            }
         else:
             # Создать файл с пустой структурой
             default_data = {
                 'resources': [],
                 'resource_groups': {}
             }
-            with open(employees_file, 'w', encoding='utf-8') as f:
-                json.dump(default_data, f, ensure_ascii=False, indent=2)
+            _write_employees_file(EMPLOYEES_FILE, default_data)
             return default_data
     except Exception as e:
         st.error(f"Ошибка при загрузке данных сотрудников: {str(e)}")
@@ -64,70 +153,75 @@ def load_employees_data():
 def save_employees_data(resources, resource_groups):
     """Сохранение данных сотрудников и групп в JSON-файл"""
     try:
-        # Получить актуальный путь (на случай изменения BASE_PATH)
-        employees_file = os.path.join(BASE_PATH, "data", "employees.json")
-        
         # Создать папку data/ если её нет
-        data_dir = os.path.dirname(employees_file)
-        os.makedirs(data_dir, exist_ok=True)
+        _ensure_data_dir()
         
         data = {
             'resources': resources,
             'resource_groups': resource_groups
         }
         
-        with open(employees_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        _write_employees_file(EMPLOYEES_FILE, data)
+        # Сбросить кэш чтения: mtime может не измениться при записи в ту же секунду
+        _read_employees_file.clear()
         return True
     except Exception as e:
         st.error(f"Ошибка при сохранении данных сотрудников: {str(e)}")
         return False
 
 
+# Общий неизменяемый результат detect_conflicts: без выделения списка на каждый вызов
+_NO_CONFLICTS = ()
+
+
 def detect_conflicts(existing_resources, new_resources):
     """Обнаружение конфликтов между существующими и новыми сотрудниками (только по имени)"""
     # Конфликты по имени обрабатываются автоматически в merge_resources (пропускаются)
-    # Эта функция возвращает пустой список, так как все конфликты по имени разрешаются автоматически
-    return []
+    # Эта функция возвращает пустую последовательность, так как все конфликты по имени
+    # разрешаются автоматически; сигнатура сохранена для совместимости
+    return _NO_CONFLICTS
 
 
-def merge_resources(existing_resources, new_resources, conflict_resolutions=None):
-    """Объединение списков сотрудников с учетом решений по конфликтам (только по имени)"""
+def merge_resources(existing_resources, new_resources, conflict_resolutions=None, copy_on_write=False):
+    """
+    Объединение списков сотрудников с учетом решений по конфликтам (только по имени)
+    
+    По умолчанию новые записи попадают в результат без копирования: вызывающий код
+    сразу заменяет ими ресурсы парсеров. copy_on_write=True копирует каждую запись.
+    """
     if conflict_resolutions is None:
         conflict_resolutions = {}
     
     # Копируем существующих сотрудников
     merged = existing_resources.copy()
     
-    # Словарь для быстрого поиска по имени
-    existing_by_name = {r.get('name'): r for r in existing_resources}
+    # Позиция сотрудника в merged по имени (при дубликатах - последний, как раньше через index).
+    # Записи без имени не индексируются: совпасть по имени с импортируемыми они не могут
+    name_to_index = {r['name']: i for i, r in enumerate(existing_resources) if 'name' in r}
+    
+    # Локальные ссылки на методы: цикл выполняется для каждого импортируемого ресурса
+    resolution_get = conflict_resolutions.get
+    index_get = name_to_index.get
+    merged_append = merged.append
     
     for new_resource in new_resources:
         new_name = new_resource.get('name', '')
         
-        # Проверяем, есть ли конфликт по имени
-        has_name_conflict = new_name in existing_by_name
-        
-        # Проверяем, есть ли решение для этого конфликта
-        conflict_key = new_name
-        resolution = conflict_resolutions.get(conflict_key)
+        # Решение по конфликту и позиция одноименного сотрудника (None - конфликта нет)
+        resolution = resolution_get(new_name)
+        existing_index = index_get(new_name)
         
         if resolution == 'skip':
             # Пропустить - не добавлять (оставить из файла)
             continue
         elif resolution == 'update':
             # Обновить существующего по имени
-            if has_name_conflict:
-                index = merged.index(existing_by_name[new_name])
-                merged[index] = new_resource.copy()
-        elif resolution == 'add_new':
-            # Добавить как нового сотрудника
-            merged.append(new_resource.copy())
-        else:
-            # По умолчанию: если имя совпадает, пропускаем (оставляем из файла)
-            # Если имя не совпадает, добавляем новый ресурс
-            if not has_name_conflict:
-                merged.append(new_resource.copy())
+            if existing_index is not None:
+                merged[existing_index] = new_resource.copy() if copy_on_write else new_resource
+        elif resolution == 'add_new' or existing_index is None:
+            # Добавить как нового сотрудника; по умолчанию - только если имя не совпадает
+            # (при совпадении имени остается сотрудник из файла)
+            merged_append(new_resource.copy() if copy_on_write else new_resource)
     
     return merged
 
@@ -146,6 +240,17 @@ def get_xml_resource_names_from_parser(parser):
     if parser is None:
         return []
     
+    # Результат запоминается на самом парсере: он живет в session_state между перезапусками,
+    # а списки назначений после разбора не меняются. Ключ - идентичность и длина этих списков.
+    sub_parsers = parser.parsers if hasattr(parser, 'parsers') else [parser]
+    cache_key = tuple(
+        (id(p.assignments), len(p.assignments)) if getattr(p, 'assignments', None) else None
+        for p in sub_parsers
+    )
+    cached = getattr(parser, '_xml_resource_names_cache', None)
+    if cached is not None and cached[0] == cache_key:
+        return list(cached[1])
+    
     xml_resource_names = set()
     
     try:
@@ -170,7 +275,159 @@ def get_xml_resource_names_from_parser(parser):
         st.warning(f"Ошибка при получении ресурсов из парсера: {str(e)}")
         return []
     
-    return sorted(list(xml_resource_names), key=str.lower)
+    result = sorted(list(xml_resource_names), key=str.lower)
+    try:
+        parser._xml_resource_names_cache = (cache_key, result)
+    except AttributeError:
+        pass
+    return list(result)
+
+
+def _mark_employees_dirty():
+    """
+    Отмечает данные сотрудников как измененные; запись выполняет _flush_employees_if_dirty
+    
+    Заодно увеличивает версию данных: по ней кэши имен узнают об изменениях на месте
+    (переименование, добавление в тот же список), не перебирая сотрудников.
+    """
+    st.session_state._employees_dirty = True
+    st.session_state._employees_version = st.session_state.get('_employees_version', 0) + 1
+
+
+def _save_employees_and_rerun():
+    """
+    Завершает обработчик, изменивший сотрудников или группы: запись и перезапуск
+    
+    Запись выполняется до st.rerun(), который прерывает скрипт, поэтому изменения
+    попадают в файл даже если следующий перезапуск завершится ошибкой.
+    """
+    _mark_employees_dirty()
+    _flush_employees_if_dirty()
+    st.rerun()
+
+
+def _reset_group_save_dialog():
+    """Закрывает диалог сохранения выбора как группы и очищает введенное название"""
+    st.session_state.group_save_dialog = None
+    st.session_state.group_save_new_name = ""
+
+
+def _flush_employees_if_dirty():
+    """
+    Записывает данные сотрудников в файл, если они изменены с последней записи
+    
+    Перезапуски без изменений не пишут на диск вовсе, а за перезапуск выполняется не
+    больше одной записи. Обработчики вкладок вызывают ее через _save_employees_and_rerun;
+    вызовы в начале и в конце render_personnel_management подхватывают флаг, поставленный
+    в обход этого пути.
+    """
+    if st.session_state.pop('_employees_dirty', False):
+        save_employees_data(
+            st.session_state.saved_resources,
+            st.session_state.resource_groups
+        )
+
+
+def _sorted_employee_names():
+    """
+    Отсортированный список имен сохраненных сотрудников
+    
+    Результат хранится в session_state и пересортировывается только при изменении
+    данных сотрудников (см. _refresh_employee_name_cache).
+    """
+    _refresh_employee_name_cache()
+    return st.session_state._sorted_all_names
+
+
+def _employee_name_set():
+    """Множество имен сохраненных сотрудников для проверки дубликатов (тот же кэш, что и у списка)"""
+    _refresh_employee_name_cache()
+    return st.session_state._employee_name_set
+
+
+def _refresh_employee_name_cache():
+    """
+    Пересобирает отсортированный список и множество имен, если данные сотрудников изменились
+    
+    Проверка за O(1): сам список saved_resources (app.py при слиянии и удаление сотрудника
+    подменяют его новым) и версия из _mark_employees_dirty (изменения на месте).
+    """
+    resources = st.session_state.saved_resources
+    version = st.session_state.get('_employees_version', 0)
+    if (st.session_state.get('_employee_names_source') is not resources
+            or st.session_state.get('_employee_names_version') != version):
+        names = [r.get('name', '') for r in resources]
+        st.session_state._employee_names_source = resources
+        st.session_state._employee_names_version = version
+        st.session_state._sorted_all_names = sorted(names, key=str.casefold)
+        st.session_state._employee_name_set = frozenset(names)
+
+
+def _sorted_group_names():
+    """Отсортированный список названий групп (кэш в session_state по составу групп)"""
+    names = tuple(st.session_state.resource_groups)
+    if st.session_state.get('_sorted_group_names_key') != names:
+        st.session_state._sorted_group_names_key = names
+        st.session_state._sorted_group_names = sorted(names, key=str.casefold)
+    return st.session_state._sorted_group_names
+
+
+def _max_units_value(max_units):
+    """Числовое значение Max Units для сортировки (запятая как десятичный разделитель, иначе 0)"""
+    text = str(max_units).replace(',', '.')
+    if not text.replace('.', '', 1).isdigit():
+        return 0
+    return float(text)
+
+
+def _filter_and_sort_employees(resources, name_filter, units_filter, sort_column, reverse):
+    """
+    Фильтрует и сортирует сотрудников для таблицы управления
+    
+    Фильтры применяются за один проход, ключ сортировки вычисляется один раз
+    на сотрудника. Возвращаются сами словари из resources (а не копии), чтобы
+    редактирование строки таблицы меняло сохраненные данные.
+    """
+    name_term = name_filter.casefold() if name_filter else ''
+    units_term = units_filter.lower() if units_filter else ''
+    
+    if name_term or units_term:
+        resources = [
+            r for r in resources
+            if name_term in str(r.get('name', '')).casefold()
+            and units_term in str(r.get('max_units', '')).lower()
+        ]
+    
+    if sort_column == 'Имя':
+        return sorted(resources, key=lambda r: str(r.get('name', '')).casefold(), reverse=reverse)
+    if sort_column == 'Max Units':
+        return sorted(resources, key=lambda r: _max_units_value(r.get('max_units', '0')), reverse=reverse)
+    return list(resources)
+
+
+def _employee_table_columns(resources):
+    """
+    Колонки таблицы сотрудников ('Имя', 'Max Units') в порядке resources
+    
+    Списки колонок заполняются за один проход по сотрудникам; st.dataframe
+    принимает словарь колонок без построчного разбора словарей.
+    """
+    names = []
+    max_units = []
+    for r in resources:
+        names.append(r.get('name', ''))
+        max_units.append(str(r.get('max_units', '1.0')))
+    return {'Имя': names, 'Max Units': max_units}
+
+
+# Значения session_state по умолчанию для render_personnel_management:
+# applied_group - примененная группа, selected_resources_state - синхронизация выбора
+# ресурсов, multiselect_key_counter - счетчик для динамического ключа multiselect
+_PM_SESSION_DEFAULTS = {
+    'applied_group': None,
+    'selected_resources_state': None,
+    'multiselect_key_counter': 0,
+}
 
 
 def render_personnel_management(workload_data, parser=None):
@@ -182,16 +439,14 @@ def render_personnel_management(workload_data, parser=None):
         parser: опциональный объект парсера (MSProjectParser или MultiProjectParser)
                 для получения списка ресурсов напрямую из XML
     """
+    # Записать изменения, отмеченные, но не записанные в предыдущем перезапуске
+    _flush_employees_if_dirty()
+    
     with st.expander("### 👥 Управление персоналом", expanded=True):
-        # Инициализация applied_group если нужно
-        if not hasattr(st.session_state, 'applied_group'):
-            st.session_state.applied_group = None
-        # Инициализация selected_resources_state для синхронизации выбора ресурсов
-        if 'selected_resources_state' not in st.session_state:
-            st.session_state.selected_resources_state = None
-        # Инициализация счетчика для динамического ключа multiselect
-        if 'multiselect_key_counter' not in st.session_state:
-            st.session_state.multiselect_key_counter = 0
+        # Инициализация состояния вкладок (только отсутствующие ключи)
+        for key, default in _PM_SESSION_DEFAULTS.items():
+            if key not in st.session_state:
+                st.session_state[key] = default
         
         # Инициализация переменных для использования вне табов
         selected_resources = []
@@ -205,7 +460,7 @@ def render_personnel_management(workload_data, parser=None):
             # Выбор из сохраненных групп
             if st.session_state.resource_groups:
                 st.markdown("**Выбрать из сохраненных групп:**")
-                sorted_group_names = sorted(st.session_state.resource_groups.keys(), key=str.lower)
+                sorted_group_names = _sorted_group_names()
                 group_names = ["-- Не выбрано --"] + sorted_group_names
                 selected_group_tab1 = st.selectbox(
                     "Выберите группу:",
@@ -229,8 +484,6 @@ def render_personnel_management(workload_data, parser=None):
                     
                     st.markdown("---")
             
-            all_names = sorted([item['resource_name'] for item in workload_data], key=str.lower)
-            
             # Поиск по имени
             col1, col2 = st.columns([3, 1])
             with col1:
@@ -239,44 +492,56 @@ def render_personnel_management(workload_data, parser=None):
                 st.markdown("<br>", unsafe_allow_html=True)
                 show_all = st.checkbox("Показать всех", value=True)
             
-            # Фильтрация данных по поиску
+            # Имена в нижнем регистре и отсортированный список ресурсов зависят только от
+            # workload_data, который хранится в session_state между перезапусками: пересчитываются
+            # только при замене списка (casefold корректно сравнивает кириллицу без учета регистра)
+            if (st.session_state.get('_wd_cache_source') is not workload_data
+                    or st.session_state.get('_wd_cache_len') != len(workload_data)):
+                name_to_lower = {item['resource_name']: item['resource_name'].casefold() for item in workload_data}
+                st.session_state._wd_cache_source = workload_data
+                st.session_state._wd_cache_len = len(workload_data)
+                st.session_state._wd_name_to_lower = name_to_lower
+                st.session_state._wd_sorted = sorted(workload_data, key=lambda x: name_to_lower[x['resource_name']])
+            name_to_lower = st.session_state._wd_name_to_lower
+            sorted_workload = st.session_state._wd_sorted
+            
+            # Фильтрация данных по поиску (порядок сохраняется, повторная сортировка не нужна)
             if show_all or not search_term:
-                filtered_data = workload_data
+                filtered_data = sorted_workload
             else:
-                filtered_data = [item for item in workload_data 
-                               if search_term.lower() in item['resource_name'].lower()]
-            
-            # Сортировка filtered_data по алфавиту
-            filtered_data = sorted(filtered_data, key=lambda x: x['resource_name'].lower())
+                term = search_term.casefold()
+                filtered_data = [item for item in sorted_workload 
+                               if term in name_to_lower[item['resource_name']]]
             
             # Получить список всех ресурсов из XML (не отфильтрованных поиском)
             # Приоритет: использовать парсер для получения ресурсов напрямую из XML
             # Если парсер не передан, использовать workload_data как fallback
+            # В обоих случаях список уже отсортирован по алфавиту
             if parser is not None:
                 xml_resource_names = get_xml_resource_names_from_parser(parser)
             else:
-                # Fallback: использовать workload_data
-                xml_resource_names = [item['resource_name'] for item in workload_data] if workload_data else []
+                # Fallback: использовать workload_data (отсортированный выше)
+                xml_resource_names = [item['resource_name'] for item in sorted_workload]
             
             # Определить состав группы, если она применена
             group_resources_for_select = []
             if st.session_state.applied_group:
                 group_name, group_resources = st.session_state.applied_group
-                group_resources_for_select = group_resources.copy()
+                group_resources_for_select = group_resources
             
             # Использовать только ресурсы из XML для options в multiselect
-            all_options = sorted(xml_resource_names, key=str.lower)
+            # (список уже отсортирован - повторная сортировка на каждом перезапуске не нужна)
+            all_options = xml_resource_names
+            # Множество для проверок принадлежности к XML (вместо линейного поиска по списку)
+            xml_name_set = set(xml_resource_names)
             
             # Сбросить selected_resources_state, если он содержит ресурсы, которых нет в XML
+            # (один проход: отфильтрованный список сравнивается с исходным по длине)
             if st.session_state.selected_resources_state is not None:
-                # Проверить, есть ли ресурсы в selected_resources_state, которых нет в XML
-                invalid_resources = [name for name in st.session_state.selected_resources_state if name not in xml_resource_names]
-                if invalid_resources:
-                    # Отфильтровать selected_resources_state, оставив только ресурсы из XML
-                    st.session_state.selected_resources_state = [name for name in st.session_state.selected_resources_state if name in xml_resource_names]
-                    # Если после фильтрации список пуст, сбросить в None
-                    if not st.session_state.selected_resources_state:
-                        st.session_state.selected_resources_state = None
+                valid_resources = [name for name in st.session_state.selected_resources_state if name in xml_name_set]
+                if len(valid_resources) != len(st.session_state.selected_resources_state):
+                    # Оставить только ресурсы из XML; если список пуст, сбросить в None
+                    st.session_state.selected_resources_state = valid_resources or None
             
             if not filtered_data and not group_resources_for_select:
                 st.warning("Ресурсы, соответствующие вашему запросу, не найдены.")
@@ -289,7 +554,7 @@ def render_personnel_management(workload_data, parser=None):
                     group_name, group_resources = st.session_state.applied_group
                     
                     # Фильтровать ресурсы из группы, оставляя только те, что есть в XML
-                    filtered_group_resources = [name for name in group_resources if name in xml_resource_names]
+                    filtered_group_resources = [name for name in group_resources if name in xml_name_set]
                     
                     # Показать предупреждение, если некоторые ресурсы из группы отсутствуют в XML
                     if len(filtered_group_resources) < len(group_resources):
@@ -300,17 +565,17 @@ def render_personnel_management(workload_data, parser=None):
                     
                     # Использовать selected_resources_state, если он установлен, иначе использовать отфильтрованные ресурсы из группы
                     if st.session_state.selected_resources_state is not None:
-                        # Фильтровать selected_resources_state, оставляя только ресурсы из XML
-                        default_resources = [name for name in st.session_state.selected_resources_state if name in xml_resource_names]
+                        # selected_resources_state уже очищен от ресурсов не из XML выше
+                        default_resources = st.session_state.selected_resources_state
                     else:
-                        default_resources = filtered_group_resources.copy()
+                        default_resources = filtered_group_resources
                 else:
                     # Группа не применена: использовать selected_resources_state или всех из XML
                     if st.session_state.selected_resources_state is not None:
-                        # Фильтровать selected_resources_state, оставляя только ресурсы из XML
-                        default_resources = [name for name in st.session_state.selected_resources_state if name in xml_resource_names]
+                        # selected_resources_state уже очищен от ресурсов не из XML выше
+                        default_resources = st.session_state.selected_resources_state
                     else:
-                        default_resources = xml_resource_names.copy()
+                        default_resources = xml_resource_names
                 
                 # Множественный выбор - options содержат только ресурсы из XML
                 # Использовать динамический ключ для принудительного пересоздания виджета при применении группы
@@ -347,67 +612,60 @@ def render_personnel_management(workload_data, parser=None):
                         if st.session_state.group_save_dialog == quick_group_name and quick_group_name:
                             st.warning(f"Группа '{quick_group_name}' уже существует. Выберите действие:")
                             
-                            save_action = st.radio(
-                                "Что вы хотите сделать?",
-                                ["Перезаписать группу", "Создать новую группу", "Отменить"],
-                                key="group_save_action_radio"
-                            )
-                            
-                            # Если выбрано "Создать новую группу", показать поле для нового имени
-                            if save_action == "Создать новую группу":
-                                st.session_state.group_save_new_name = st.text_input(
-                                    "Введите название новой группы:",
+                            # Форма: выбор действия и ввод имени не вызывают перезапуск скрипта,
+                            # все значения отправляются одним перезапуском по кнопке
+                            with st.form("save_group_form"):
+                                save_action = st.radio(
+                                    "Что вы хотите сделать?",
+                                    ["Перезаписать группу", "Создать новую группу", "Отменить"],
+                                    key="group_save_action_radio"
+                                )
+                                
+                                # Имя используется только при выборе "Создать новую группу"
+                                new_group_name_input = st.text_input(
+                                    "Название новой группы (для варианта «Создать новую группу»):",
                                     value=st.session_state.group_save_new_name,
                                     placeholder="например, Команда А (копия)",
                                     key="group_save_new_name_input"
                                 )
+                                
+                                col1, col2 = st.columns(2)
+                                with col1:
+                                    confirm_clicked = st.form_submit_button("✅ Подтвердить")
+                                with col2:
+                                    cancel_clicked = st.form_submit_button("❌ Отменить")
                             
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                if st.button("✅ Подтвердить", key="confirm_save_btn"):
-                                    if save_action == "Перезаписать группу":
-                                        # Перезаписать группу с новым составом
-                                        st.session_state.resource_groups[quick_group_name] = selected_resources.copy()
-                                        # Обновить примененную группу, если она была изменена
-                                        if st.session_state.applied_group and st.session_state.applied_group[0] == quick_group_name:
-                                            st.session_state.applied_group = (quick_group_name, selected_resources.copy())
-                                            # Обновить selected_resources_state списком ресурсов из перезаписанной группы
-                                            st.session_state.selected_resources_state = selected_resources.copy()
-                                        # Сохранить в файл
-                                        save_employees_data(
-                                            st.session_state.saved_resources,
-                                            st.session_state.resource_groups
-                                        )
-                                        st.success(f"✓ Группа '{quick_group_name}' перезаписана ({len(selected_resources)} чел.)")
-                                        st.session_state.group_save_dialog = None
-                                        st.session_state.group_save_new_name = ""
-                                        st.rerun()
-                                    elif save_action == "Создать новую группу":
-                                        # Создать новую группу с новым именем
-                                        new_name = st.session_state.group_save_new_name
-                                        if not new_name:
-                                            st.error("Введите название новой группы")
-                                        elif new_name in st.session_state.resource_groups:
-                                            st.error("Группа с таким названием уже существует")
-                                        else:
-                                            st.session_state.resource_groups[new_name] = selected_resources.copy()
-                                            # Сохранить в файл
-                                            save_employees_data(
-                                                st.session_state.saved_resources,
-                                                st.session_state.resource_groups
-                                            )
-                                            st.success(f"✓ Группа '{new_name}' создана ({len(selected_resources)} чел.)")
-                                            st.session_state.group_save_dialog = None
-                                            st.session_state.group_save_new_name = ""
-                                            st.rerun()
-                                    else:  # Отменить
-                                        st.session_state.group_save_dialog = None
-                                        st.session_state.group_save_new_name = ""
-                                        st.rerun()
-                            with col2:
-                                if st.button("❌ Отменить", key="cancel_save_btn"):
-                                    st.session_state.group_save_dialog = None
-                                    st.session_state.group_save_new_name = ""
+                            if cancel_clicked:
+                                _reset_group_save_dialog()
+                                st.rerun()
+                            elif confirm_clicked:
+                                st.session_state.group_save_new_name = new_group_name_input
+                                if save_action == "Перезаписать группу":
+                                    # Перезаписать группу с новым составом. Список из multiselect
+                                    # создается заново на каждом перезапуске, а selected_resources_state
+                                    # уже хранит свою копию выбора - группе копия не нужна
+                                    st.session_state.resource_groups[quick_group_name] = selected_resources
+                                    # Обновить примененную группу, если она была изменена
+                                    # (как и при применении группы - ссылка на список группы)
+                                    if st.session_state.applied_group and st.session_state.applied_group[0] == quick_group_name:
+                                        st.session_state.applied_group = (quick_group_name, selected_resources)
+                                    st.success(f"✓ Группа '{quick_group_name}' перезаписана ({len(selected_resources)} чел.)")
+                                    _reset_group_save_dialog()
+                                    _save_employees_and_rerun()
+                                elif save_action == "Создать новую группу":
+                                    # Создать новую группу с новым именем
+                                    new_name = st.session_state.group_save_new_name
+                                    if not new_name:
+                                        st.error("Введите название новой группы")
+                                    elif new_name in st.session_state.resource_groups:
+                                        st.error("Группа с таким названием уже существует")
+                                    else:
+                                        st.session_state.resource_groups[new_name] = selected_resources
+                                        st.success(f"✓ Группа '{new_name}' создана ({len(selected_resources)} чел.)")
+                                        _reset_group_save_dialog()
+                                        _save_employees_and_rerun()
+                                else:  # Отменить
+                                    _reset_group_save_dialog()
                                     st.rerun()
                         else:
                             # Кнопка сохранения (показывается только когда диалог не активен)
@@ -420,20 +678,17 @@ def render_personnel_management(workload_data, parser=None):
                                     st.rerun()
                                 else:
                                     # Группа не существует, создать новую
-                                    st.session_state.resource_groups[quick_group_name] = selected_resources.copy()
-                                    # Сохранить в файл
-                                    save_employees_data(
-                                        st.session_state.saved_resources,
-                                        st.session_state.resource_groups
-                                    )
+                                    st.session_state.resource_groups[quick_group_name] = selected_resources
                                     st.success(f"✓ Группа '{quick_group_name}' создана ({len(selected_resources)} чел.)")
-                                    st.rerun()
+                                    _save_employees_and_rerun()
                 
                 if selected_resources:
                     # Использовать workload_data вместо filtered_data для отображения всех выбранных ресурсов
                     # Это позволяет показывать ресурсы из группы, даже если они не проходят фильтр поиска
+                    # Множество выбранных имен: проверка принадлежности за O(1) для каждой строки
+                    selected_set = set(selected_resources)
                     display_data = [item for item in workload_data 
-                                  if item['resource_name'] in selected_resources]
+                                  if item['resource_name'] in selected_set]
                 else:
                     display_data = workload_data
         
@@ -442,7 +697,7 @@ def render_personnel_management(workload_data, parser=None):
             # Выбор и применение сохраненной группы
             if st.session_state.resource_groups:
                 st.markdown("**Применить сохраненную группу:**")
-                sorted_group_names = sorted(st.session_state.resource_groups.keys(), key=str.lower)
+                sorted_group_names = _sorted_group_names()
                 group_names = ["-- Не выбрано --"] + sorted_group_names
                 selected_group = st.selectbox(
                     "Выберите группу:",
@@ -474,7 +729,7 @@ def render_personnel_management(workload_data, parser=None):
                 new_group_name = st.text_input("Название группы:", placeholder="например, Разработчики", key="new_group_name_input")
                 
                 # Использовать полный список сохраненных сотрудников
-                all_names = sorted([r.get('name', '') for r in st.session_state.saved_resources], key=str.lower)
+                all_names = _sorted_employee_names()
                 new_group_resources = st.multiselect(
                     "Выберите участников группы:",
                     options=all_names,
@@ -490,20 +745,16 @@ def render_personnel_management(workload_data, parser=None):
                         st.error("Группа с таким названием уже существует")
                     else:
                         st.session_state.resource_groups[new_group_name] = new_group_resources
-                        # Сохранить в файл
-                        save_employees_data(
-                            st.session_state.saved_resources,
-                            st.session_state.resource_groups
-                        )
                         st.success(f"✓ Группа '{new_group_name}' создана ({len(new_group_resources)} чел.)")
-                        st.rerun()
+                        _save_employees_and_rerun()
             
             # Управление существующими группами
             if st.session_state.resource_groups:
                 st.markdown("---")
                 st.markdown("**Управление группами:**")
-                for group_name in list(st.session_state.resource_groups.keys()):
-                    group_members = st.session_state.resource_groups[group_name]
+                # Снимок пар (название, состав): удаление группы внутри цикла не ломает итерацию
+                group_items = tuple(st.session_state.resource_groups.items())
+                for group_name, group_members in group_items:
                     
                     # Заголовок группы с кнопкой удаления
                     col1, col2 = st.columns([4, 1])
@@ -516,18 +767,15 @@ def render_personnel_management(workload_data, parser=None):
                                 st.session_state.applied_group = None
                                 # Сбросить selected_resources_state при удалении примененной группы
                                 st.session_state.selected_resources_state = None
-                            # Сохранить в файл
-                            save_employees_data(
-                                st.session_state.saved_resources,
-                                st.session_state.resource_groups
-                            )
                             st.success(f"✓ Группа '{group_name}' удалена")
-                            st.rerun()
+                            _save_employees_and_rerun()
                     
-                    # Expander для редактирования состава группы
-                    with st.expander(f"✏️ Редактировать группу '{group_name}'"):
+                    # Редактирование состава группы: multiselect со всеми сотрудниками строится
+                    # только для групп, открытых переключателем (состояние хранится в виджете),
+                    # а не для каждой группы на каждом перезапуске, как в свернутом expander
+                    if st.toggle(f"✏️ Редактировать группу '{group_name}'", key=f"edit_group_open_{group_name}"):
                         # Использовать полный список сохраненных сотрудников
-                        all_names = sorted([r.get('name', '') for r in st.session_state.saved_resources], key=str.lower)
+                        all_names = _sorted_employee_names()
                         edited_group_resources = st.multiselect(
                             "Выберите участников группы:",
                             options=all_names,
@@ -536,19 +784,16 @@ def render_personnel_management(workload_data, parser=None):
                         )
                         
                         if st.button("💾 Сохранить изменения", key=f"save_edit_{group_name}"):
-                            st.session_state.resource_groups[group_name] = edited_group_resources.copy()
+                            # Список из multiselect новый на каждом перезапуске - группа забирает его без копии
+                            st.session_state.resource_groups[group_name] = edited_group_resources
                             # Обновить примененную группу, если она была изменена
                             if st.session_state.applied_group and st.session_state.applied_group[0] == group_name:
-                                st.session_state.applied_group = (group_name, edited_group_resources.copy())
+                                st.session_state.applied_group = (group_name, edited_group_resources)
                                 # Обновить selected_resources_state списком ресурсов из обновленной группы
+                                # (отдельная копия: список группы меняется на месте при переименовании)
                                 st.session_state.selected_resources_state = edited_group_resources.copy()
-                            # Сохранить в файл
-                            save_employees_data(
-                                st.session_state.saved_resources,
-                                st.session_state.resource_groups
-                            )
                             st.success(f"✓ Группа '{group_name}' обновлена ({len(edited_group_resources)} чел.)")
-                            st.rerun()
+                            _save_employees_and_rerun()
                     
                     st.markdown("")  # Добавить отступ между группами
         
@@ -572,20 +817,15 @@ def render_personnel_management(workload_data, parser=None):
                         if r.get('name') != employee_name_to_delete
                     ]
                     # Обновить группы - удалить сотрудника из всех групп
-                    for group_name in st.session_state.resource_groups:
-                        st.session_state.resource_groups[group_name] = [
-                            name for name in st.session_state.resource_groups[group_name]
-                            if name != employee_name_to_delete
-                        ]
-                    # Сохранить в файл
-                    save_employees_data(
-                        st.session_state.saved_resources,
-                        st.session_state.resource_groups
-                    )
+                    # (пересобираются только группы, в которых он есть)
+                    groups = st.session_state.resource_groups
+                    for group_name, members in groups.items():
+                        if employee_name_to_delete in members:
+                            groups[group_name] = [name for name in members if name != employee_name_to_delete]
                     st.success(f"✓ Сотрудник '{employee_name_to_delete}' удален")
                     st.session_state.delete_employee_name = None
                     st.session_state.editing_employee = None
-                    st.rerun()
+                    _save_employees_and_rerun()
                 
                 # Инициализация состояния для фильтров и сортировки
                 if 'filter_name' not in st.session_state:
@@ -630,211 +870,103 @@ def render_personnel_management(workload_data, parser=None):
                     )
                     st.session_state.sort_direction = sort_direction
                 
-                # Применение фильтров
-                filtered_resources = st.session_state.saved_resources.copy()
-                
-                if st.session_state.filter_name:
-                    filtered_resources = [
-                        r for r in filtered_resources 
-                        if st.session_state.filter_name.lower() in str(r.get('name', '')).lower()
-                    ]
-                
-                if st.session_state.filter_max_units:
-                    filtered_resources = [
-                        r for r in filtered_resources 
-                        if st.session_state.filter_max_units.lower() in str(r.get('max_units', '')).lower()
-                    ]
-                
-                # Применение сортировки
-                sort_reverse = st.session_state.sort_direction == 'По убыванию'
-                
-                if st.session_state.sort_column == 'Имя':
-                    sorted_resources = sorted(
-                        filtered_resources,
-                        key=lambda x: str(x.get('name', '')).lower(),
-                        reverse=sort_reverse
-                    )
-                elif st.session_state.sort_column == 'Max Units':
-                    sorted_resources = sorted(
-                        filtered_resources,
-                        key=lambda x: float(str(x.get('max_units', '0')).replace(',', '.')) if str(x.get('max_units', '0')).replace(',', '.').replace('.', '').isdigit() else 0,
-                        reverse=sort_reverse
-                    )
-                else:
-                    sorted_resources = filtered_resources
+                # Применение фильтров и сортировки
+                sorted_resources = _filter_and_sort_employees(
+                    st.session_state.saved_resources,
+                    st.session_state.filter_name,
+                    st.session_state.filter_max_units,
+                    st.session_state.sort_column,
+                    st.session_state.sort_direction == 'По убыванию'
+                )
                 
                 # Показать количество отфильтрованных записей
-                if len(filtered_resources) != len(st.session_state.saved_resources):
-                    st.info(f"Показано {len(filtered_resources)} из {len(st.session_state.saved_resources)} сотрудников")
+                if len(sorted_resources) != len(st.session_state.saved_resources):
+                    st.info(f"Показано {len(sorted_resources)} из {len(st.session_state.saved_resources)} сотрудников")
                 
-                # CSS стили для таблицы сотрудников
-                st.markdown("""
-                <style>
-                /* Уменьшение высоты кнопок до высоты текста в таблице сотрудников */
-                button[kind="secondary"] {
-                    height: auto !important;
-                    min-height: 1.5em !important;
-                    padding: 0.25em 0.5em !important;
-                    line-height: 1.2 !important;
-                }
+                # Редактирование выбранного сотрудника
+                editing_employee = next(
+                    (r for r in st.session_state.saved_resources
+                     if r.get('name') == st.session_state.editing_employee),
+                    None
+                ) if st.session_state.editing_employee is not None else None
                 
-                /* Уменьшение межстрочного интервала в таблице */
-                div[data-testid="stVerticalBlock"] > div[data-testid="stVerticalBlock"] {
-                    margin-bottom: 2px !important;
-                    padding-bottom: 2px !important;
-                }
-                
-                /* Уменьшение отступов в контейнерах строк таблицы */
-                div[data-testid="stVerticalBlock"] > div[data-testid="stVerticalBlock"] > div {
-                    margin-bottom: 2px !important;
-                }
-                
-                /* Уменьшение отступов между колонками в строках */
-                div[data-testid="column"] {
-                    margin-bottom: 2px !important;
-                }
-                </style>
-                """, unsafe_allow_html=True)
-                
-                # JavaScript для применения стилей прокрутки к таблице
-                st.markdown("""
-                <script>
-                setTimeout(function() {
-                    // Найти контейнер с заголовками таблицы
-                    const headers = Array.from(document.querySelectorAll('*')).find(el => 
-                        el.textContent && el.textContent.includes('Имя') && 
-                        el.textContent.includes('Max Units')
-                    );
-                    if (headers) {
-                        // Найти родительский контейнер Streamlit
-                        let container = headers.closest('[data-testid="stVerticalBlock"]');
-                        if (!container) {
-                            container = headers.closest('div[class*="block-container"]');
-                        }
-                        if (container) {
-                            container.style.maxHeight = '400px';
-                            container.style.overflowY = 'auto';
-                            container.style.overflowX = 'auto';
-                            container.style.border = '1px solid #e0e0e0';
-                            container.style.borderRadius = '4px';
-                            container.style.padding = '10px';
-                        }
-                        
-                        // Применить стили к кнопкам в таблице
-                        const buttons = container.querySelectorAll('button[kind="secondary"]');
-                        buttons.forEach(button => {
-                            button.style.height = 'auto';
-                            button.style.minHeight = '1.5em';
-                            button.style.padding = '0.25em 0.5em';
-                            button.style.lineHeight = '1.2';
-                        });
-                        
-                        // Уменьшить межстрочный интервал между строками таблицы
-                        const verticalBlocks = container.querySelectorAll('[data-testid="stVerticalBlock"]');
-                        verticalBlocks.forEach((block, index) => {
-                            // Пропустить первый блок (заголовки) и применить к остальным
-                            if (index > 0) {
-                                block.style.marginBottom = '2px';
-                                block.style.paddingBottom = '2px';
-                                
-                                // Также уменьшить отступы внутри блока
-                                const innerDivs = block.querySelectorAll('div[data-testid="stVerticalBlock"]');
-                                innerDivs.forEach(innerDiv => {
-                                    innerDiv.style.marginBottom = '2px';
-                                    innerDiv.style.paddingBottom = '2px';
-                                });
-                                
-                                // Уменьшить отступы в колонках
-                                const columns = block.querySelectorAll('[data-testid="column"]');
-                                columns.forEach(column => {
-                                    column.style.marginBottom = '2px';
-                                });
-                            }
-                        });
-                    }
-                }, 200);
-                </script>
-                """, unsafe_allow_html=True)
-                
-                # Заголовки таблицы
-                st.markdown("---")
-                header_col1, header_col2, header_col3, header_col4 = st.columns([3, 2, 1, 1])
-                with header_col1:
-                    st.markdown("**Имя**")
-                with header_col2:
-                    st.markdown("**Max Units**")
-                with header_col3:
-                    st.markdown("**Действия**")
-                with header_col4:
-                    st.markdown("")
-                
-                # Отображение списка сотрудников с кнопками
-                for idx, employee in enumerate(sorted_resources):
-                    employee_name = employee.get('name', '')
-                    employee_max_units = employee.get('max_units', '1.0')
+                if editing_employee is not None:
+                    employee_name = editing_employee.get('name', '')
+                    employee_max_units = editing_employee.get('max_units', '1.0')
+                    with st.container():
+                        st.markdown("---")
+                        st.markdown(f"**✏️ Редактирование: {employee_name}**")
                     
-                    # Если этот сотрудник редактируется
-                    if st.session_state.editing_employee == employee_name:
-                        with st.container():
-                            st.markdown("---")
-                            st.markdown(f"**✏️ Редактирование: {employee_name}**")
-                            
-                            col1, col2, col3 = st.columns([2, 2, 1])
-                            with col1:
-                                edited_name = st.text_input("Имя:", value=employee_name, key=f"edit_name_{idx}")
-                            with col2:
-                                edited_max_units = st.text_input("Max Units:", value=employee_max_units, key=f"edit_max_units_{idx}")
-                            with col3:
-                                st.markdown("<br>", unsafe_allow_html=True)  # Отступ для выравнивания
-                                save_col, cancel_col = st.columns(2)
-                                with save_col:
-                                    if st.button("💾", key=f"save_{idx}", help="Сохранить"):
-                                        # Проверить на дубликаты (кроме текущего)
-                                        existing_names = [r.get('name') for r in st.session_state.saved_resources if r.get('name') != employee_name]
-                                        
-                                        if edited_name in existing_names:
-                                            st.error(f"Сотрудник с именем '{edited_name}' уже существует")
-                                        else:
-                                            # Обновить данные сотрудника
-                                            old_name = employee['name']
-                                            employee['name'] = edited_name
-                                            employee['max_units'] = edited_max_units
-                                            
-                                            # Обновить имя в группах, если оно изменилось
-                                            if edited_name != old_name:
-                                                for group_name in st.session_state.resource_groups:
-                                                    if old_name in st.session_state.resource_groups[group_name]:
-                                                        index = st.session_state.resource_groups[group_name].index(old_name)
-                                                        st.session_state.resource_groups[group_name][index] = edited_name
-                                            
-                                            # Сохранить в файл
-                                            save_employees_data(
-                                                st.session_state.saved_resources,
-                                                st.session_state.resource_groups
-                                            )
-                                            st.session_state.editing_employee = None
-                                            st.success(f"✓ Сотрудник '{edited_name}' обновлен")
-                                            st.rerun()
-                                with cancel_col:
-                                    if st.button("❌", key=f"cancel_{idx}", help="Отменить"):
+                        col1, col2, col3 = st.columns([2, 2, 1])
+                        with col1:
+                            edited_name = st.text_input("Имя:", value=employee_name, key=f"edit_name_{employee_name}")
+                        with col2:
+                            edited_max_units = st.text_input("Max Units:", value=employee_max_units, key=f"edit_max_units_{employee_name}")
+                        with col3:
+                            st.markdown("<br>", unsafe_allow_html=True)  # Отступ для выравнивания
+                            save_col, cancel_col = st.columns(2)
+                            with save_col:
+                                if st.button("💾", key="save_employee_edit", help="Сохранить"):
+                                    # Проверить на дубликаты (кроме текущего)
+                                    if edited_name != employee_name and edited_name in _employee_name_set():
+                                        st.error(f"Сотрудник с именем '{edited_name}' уже существует")
+                                    else:
+                                        # Обновить данные сотрудника
+                                        old_name = editing_employee['name']
+                                        editing_employee['name'] = edited_name
+                                        editing_employee['max_units'] = edited_max_units
+                                    
+                                        # Обновить имя в группах, если оно изменилось
+                                        # (один проход по составу группы вместо проверки in и затем .index)
+                                        if edited_name != old_name:
+                                            for group_members in st.session_state.resource_groups.values():
+                                                try:
+                                                    index = group_members.index(old_name)
+                                                except ValueError:
+                                                    continue
+                                                group_members[index] = edited_name
+                                    
                                         st.session_state.editing_employee = None
-                                        st.rerun()
-                    else:
-                        # Обычное отображение строки сотрудника
-                        with st.container():
-                            col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
-                            with col1:
-                                st.text(employee_name)
-                            with col2:
-                                st.text(employee_max_units)
-                            with col3:
-                                if st.button("✏️", key=f"edit_{idx}", help="Редактировать"):
-                                    st.session_state.editing_employee = employee_name
-                                    st.rerun()
-                            with col4:
-                                if st.button("🗑️", key=f"delete_{idx}", help="Удалить"):
-                                    st.session_state.delete_employee_name = employee_name
+                                        st.success(f"✓ Сотрудник '{edited_name}' обновлен")
+                                        _save_employees_and_rerun()
+                            with cancel_col:
+                                if st.button("❌", key="cancel_employee_edit", help="Отменить"):
+                                    st.session_state.editing_employee = None
                                     st.rerun()
+                
+                # Таблица сотрудников: один виджет с виртуальной прокруткой вместо
+                # строки из колонок и кнопок на каждого сотрудника
+                table_event = st.dataframe(
+                    _employee_table_columns(sorted_resources),
+                    use_container_width=True,
+                    height=400,
+                    hide_index=True,
+                    key="employees_df",
+                    on_select="rerun",
+                    selection_mode="single-row"
+                )
+                
+                selected_rows = table_event.selection.rows
+                selected_employee_name = (
+                    sorted_resources[selected_rows[0]].get('name', '')
+                    if selected_rows and selected_rows[0] < len(sorted_resources) else None
+                )
+                
+                # Действия над выбранной строкой
+                action_col1, action_col2, action_col3 = st.columns([1, 1, 3])
+                with action_col1:
+                    if st.button("✏️ Редактировать", key="edit_selected_employee",
+                                 disabled=selected_employee_name is None, use_container_width=True):
+                        st.session_state.editing_employee = selected_employee_name
+                        st.rerun()
+                with action_col2:
+                    if st.button("🗑️ Удалить", key="delete_selected_employee",
+                                 disabled=selected_employee_name is None, use_container_width=True):
+                        st.session_state.delete_employee_name = selected_employee_name
+                        st.rerun()
+                with action_col3:
+                    if selected_employee_name is None:
+                        st.caption("Выберите сотрудника в таблице, чтобы изменить или удалить его")
             else:
                 st.info("Список сотрудников пуст. Добавьте сотрудников через форму ниже или загрузите XML-файл проекта.")
             
@@ -850,9 +982,7 @@ def render_personnel_management(workload_data, parser=None):
                         st.error("Введите имя сотрудника")
                     else:
                         # Проверить на дубликаты по имени
-                        existing_names = [r.get('name') for r in st.session_state.saved_resources]
-                        
-                        if new_employee_name in existing_names:
+                        if new_employee_name in _employee_name_set():
                             st.error(f"Сотрудник с именем '{new_employee_name}' уже существует")
                         else:
                             new_employee = {
@@ -860,14 +990,12 @@ def render_personnel_management(workload_data, parser=None):
                                 'max_units': new_employee_max_units or '1.0'
                             }
                             st.session_state.saved_resources.append(new_employee)
-                            # Сохранить в файл
-                            save_employees_data(
-                                st.session_state.saved_resources,
-                                st.session_state.resource_groups
-                            )
                             st.success(f"✓ Сотрудник '{new_employee_name}' добавлен")
-                            st.rerun()
+                            _save_employees_and_rerun()
     
     # Возвращаем выбранные ресурсы и данные для отображения
+    # Записать изменения этого перезапуска (не более одной записи)
+    _flush_employees_if_dirty()
+    
     return selected_resources, display_data
 
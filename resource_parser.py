@@ -1,7 +1,11 @@
 """
 Модуль для парсинга ресурсов из XML файлов MS Project
 """
-from msproject_utils import setup_logger, get_text, make_tag, find_elements
+import logging
+from sys import intern
+
+# get_text импортируется и для обратной совместимости (test_resource_parser.py берет его отсюда)
+from msproject_utils import setup_logger, get_text, clark_tags, find_elements
 
 # Настройка логирования
 logger = setup_logger(__name__)
@@ -25,61 +29,93 @@ def parse_resources(root, namespace, filter_inactive=True):
             'is_inactive': is_inactive
         }, ...]
     """
-    resources = []
-    
     # Поиск всех элементов Resource
     resource_elements = find_elements(root, 'Resource', namespace)
     
     logger.info(f"Найдено {len(resource_elements)} элементов Resource в XML")
     
-    skipped_count = 0
-    parsed_count = 0
-    
-    for idx, resource in enumerate(resource_elements):
-        try:
-            # Извлечение основных полей
-            resource_id = get_text(resource, make_tag('UID', namespace), namespace)
-            name = get_text(resource, make_tag('Name', namespace), namespace)
-            
-            # Проверка на пустые значения (после strip)
-            # Пустая строка после strip() должна быть отфильтрована
-            if not resource_id or not resource_id.strip():
-                logger.warning(f"Ресурс #{idx}: пропущен из-за пустого UID")
-                skipped_count += 1
-                continue
-            
-            if not name or not name.strip():
-                logger.warning(f"Ресурс #{idx} (UID={resource_id}): пропущен из-за пустого Name")
-                skipped_count += 1
-                continue
-            
-            # Извлечение MaxUnits и IsInactive
-            # MaxUnits может отсутствовать - используется default значение '1.0'
-            max_units = get_text(resource, make_tag('MaxUnits', namespace), namespace, default='1.0')
-            is_inactive = get_text(resource, make_tag('IsInactive', namespace), namespace, default='0')
-            
-            # Фильтрация по IsInactive
-            if filter_inactive and is_inactive == '1':
-                logger.debug(f"Ресурс #{idx} (UID={resource_id}, Name={name}): пропущен из-за IsInactive=1")
-                skipped_count += 1
-                continue
-            
-            # Добавление ресурса
-            # Преобразуем ID в строку для единообразия
-            resources.append({
-                'id': str(resource_id),
-                'name': name,
-                'max_units': max_units,
-                'is_inactive': is_inactive
-            })
-            parsed_count += 1
-            
-        except Exception as e:
-            logger.error(f"Ошибка при парсинге ресурса #{idx}: {e}")
-            skipped_count += 1
-            continue
+    # Записи остаются словарями: к ним обращаются по ключам в app.py, assignment_parser
+    # и personnel_management. MaxUnits и IsInactive почти у всех ресурсов одинаковые
+    # ('1', '0') - интернирование оставляет один объект строки на значение
+    resources = [
+        {
+            'id': resource_id,
+            'name': name,
+            'max_units': intern(max_units),
+            'is_inactive': intern(is_inactive)
+        }
+        for resource_id, name, max_units, is_inactive
+        in _iter_resource_fields(resource_elements, namespace, filter_inactive)
+    ]
     
+    parsed_count = len(resources)
+    skipped_count = len(resource_elements) - parsed_count
     logger.info(f"Парсинг ресурсов завершен: найдено {len(resource_elements)}, обработано {parsed_count}, пропущено {skipped_count}")
     
     return resources
 
+
+def _iter_resource_fields(resource_elements, namespace, filter_inactive):
+    """
+    Перебирает поля (UID, Name, MaxUnits, IsInactive) ресурсов, прошедших проверку
+    
+    Ресурсы с пустым UID или Name, а также неактивные (при filter_inactive)
+    пропускаются с записью причины в лог.
+    """
+    # Теги полей в нотации Кларка вычисляются один раз, а не для каждого ресурса
+    field_tags = clark_tags(namespace, 'UID', 'Name', 'MaxUnits', 'IsInactive')
+    uid_tag, name_tag, max_units_tag, is_inactive_tag = field_tags
+    
+    for idx, resource in enumerate(resource_elements):
+        # Все четыре поля читаются за один проход по дочерним элементам ресурса
+        fields = _child_texts(resource, field_tags)
+        
+        # Неактивные ресурсы при filter_inactive отбрасываются до проверки остальных полей
+        is_inactive = _field_text(fields, is_inactive_tag, default='0')
+        if filter_inactive and is_inactive == '1':
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"Ресурс #{idx} (UID={_field_text(fields, uid_tag)}, "
+                    f"Name={_field_text(fields, name_tag)}): пропущен из-за IsInactive=1"
+                )
+            continue
+        
+        # Извлечение основных полей
+        resource_id = _field_text(fields, uid_tag)
+        name = _field_text(fields, name_tag)
+        
+        # Проверка на пустые значения (после strip)
+        # Пустая строка после strip() должна быть отфильтрована
+        if not resource_id:
+            logger.warning(f"Ресурс #{idx}: пропущен из-за пустого UID")
+            continue
+        
+        if not name:
+            logger.warning(f"Ресурс #{idx} (UID={resource_id}): пропущен из-за пустого Name")
+            continue
+        
+        # MaxUnits может отсутствовать - используется default значение '1.0'
+        max_units = _field_text(fields, max_units_tag, default='1.0')
+        
+        yield resource_id, name, max_units, is_inactive
+
+
+def _child_texts(element, tags):
+    """
+    Тексты дочерних элементов с тегами из tags: {тег: текст}
+    
+    iterchildren с набором тегов фильтрует дочерние элементы на уровне C за один
+    проход вместо отдельного findtext на каждое поле. Как и у findtext,
+    учитывается первое вхождение тега.
+    """
+    texts = {}
+    for child in element.iterchildren(*tags):
+        if child.tag not in texts:
+            texts[child.tag] = child.text
+    return texts
+
+
+def _field_text(fields, tag, default=''):
+    """Текст поля из результата _child_texts (без пробелов по краям) или default"""
+    text = fields.get(tag)
+    return text.strip() if text else default
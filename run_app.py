@@ -2,30 +2,24 @@
 Launcher script для запуска Streamlit приложения через PyInstaller
 Этот файл решает проблему "must be run with streamlit run"
 """
+import importlib
 import sys
 import os
 import socket
 
-# Попытка импорта Streamlit CLI с fallback вариантами
+# Модули Streamlit CLI в порядке предпочтения: streamlit.web.cli (Streamlit 1.50.0+),
+# streamlit.cli (старые версии). streamlit.web.cli указан в hiddenimports app.spec
+_STCLI_MODULES = ('streamlit.web.cli', 'streamlit.cli')
+
 stcli = None
 import_error = None
 
-# Вариант 1: прямой импорт streamlit.web.cli (работает в Streamlit 1.50.0+)
-try:
-    import streamlit.web.cli as stcli
-except ImportError as e:
-    import_error = str(e)
-    # Вариант 2: from streamlit.web import cli
+for _module_name in _STCLI_MODULES:
     try:
-        from streamlit.web import cli as stcli
-    except ImportError as e2:
-        import_error = str(e2)
-        # Вариант 3: from streamlit import cli
-        try:
-            from streamlit import cli as stcli
-        except ImportError as e3:
-            import_error = str(e3)
-            stcli = None
+        stcli = importlib.import_module(_module_name)
+        break
+    except ImportError as e:
+        import_error = str(e)
 
 if stcli is None:
     print("ОШИБКА: Не удалось импортировать Streamlit CLI")
@@ -40,73 +34,58 @@ if stcli is None:
         print("Установите: pip install streamlit")
     sys.exit(1)
 
-def get_base_path():
-    """Определяет базовый путь для frozen и обычного режима"""
-    if getattr(sys, 'frozen', False):
-        # Если запущено через PyInstaller
-        # sys._MEIPASS - временная папка с распакованными файлами
-        # sys.executable - путь к .exe файлу
-        # Базовый путь - директория, где находится .exe
-        if hasattr(sys, '_MEIPASS'):
-            # Для однофайловой сборки
-            base_path = os.path.dirname(sys.executable)
-        else:
-            # Для многофайловой сборки
-            base_path = os.path.dirname(sys.executable)
-    else:
-        # Если запущено напрямую через Python
-        base_path = os.path.dirname(os.path.abspath(__file__))
-    
-    return base_path
+# Режим запуска и пути определяются один раз при импорте: в frozen-режиме каждое
+# обращение к файловой системе проходит через распакованный архив PyInstaller
+_FROZEN = getattr(sys, 'frozen', False)
+# sys._MEIPASS - временная папка с распакованными файлами (однофайловая сборка)
+_MEIPASS = getattr(sys, '_MEIPASS', None)
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Базовый путь: директория .exe в frozen-режиме, иначе директория скрипта
+_BASE_PATH = os.path.dirname(sys.executable) if _FROZEN else _SCRIPT_DIR
 
-def get_app_path():
-    """Определяет путь к app.py"""
-    if getattr(sys, 'frozen', False):
-        # В frozen приложении app.py находится в sys._MEIPASS
-        if hasattr(sys, '_MEIPASS'):
-            app_path = os.path.join(sys._MEIPASS, 'app.py')
-            if os.path.exists(app_path):
-                return app_path
-        # Fallback: ищем рядом с .exe
-        base_path = os.path.dirname(sys.executable)
-        app_path = os.path.join(base_path, 'app.py')
-        if os.path.exists(app_path):
-            return app_path
+def _resolve_app_path():
+    """Находит app.py: в frozen-режиме в sys._MEIPASS, затем рядом с .exe; иначе рядом со скриптом"""
+    if _FROZEN:
+        candidates = [os.path.join(_MEIPASS, 'app.py')] if _MEIPASS else []
+        candidates.append(os.path.join(_BASE_PATH, 'app.py'))
     else:
-        # В обычном режиме app.py в той же директории
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        app_path = os.path.join(base_path, 'app.py')
+        candidates = [os.path.join(_SCRIPT_DIR, 'app.py')]
+    
+    for app_path in candidates:
         if os.path.exists(app_path):
             return app_path
     
     # Если не нашли, возвращаем предполагаемый путь
-    if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
-        return os.path.join(sys._MEIPASS, 'app.py')
-    else:
-        return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+    if _FROZEN and _MEIPASS:
+        return os.path.join(_MEIPASS, 'app.py')
+    return os.path.join(_SCRIPT_DIR, 'app.py')
 
-def is_port_available(port, host='localhost'):
-    """Проверяет, доступен ли порт"""
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            try:
-                s.bind((host, port))
-                return True  # Порт свободен, если bind успешен
-            except OSError:
-                return False  # Порт занят
-    except Exception:
-        return False
+_APP_PATH = _resolve_app_path()
 
-def find_free_port(start_port=8501, max_attempts=100):
-    """Находит свободный порт, начиная с start_port"""
-    for i in range(max_attempts):
-        port = start_port + i
-        if is_port_available(port):
-            return port
-    # Если не нашли свободный порт, возвращаем начальный
-    # Streamlit сам попробует найти свободный порт
-    return start_port
+def get_base_path():
+    """Определяет базовый путь для frozen и обычного режима"""
+    return _BASE_PATH
+
+def get_app_path():
+    """Определяет путь к app.py"""
+    return _APP_PATH
+
+def pick_port(preferred_port=8501, host='localhost'):
+    """
+    Возвращает порт для Streamlit: preferred_port, если он свободен, иначе порт,
+    выбранный ядром (bind на порт 0)
+    
+    Обе попытки выполняются на одном сокете: после неудачного bind сокет остается
+    непривязанным и его можно привязать повторно. Сокет закрывается до запуска
+    Streamlit - удерживать его нельзя, иначе порт останется занятым.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind((host, preferred_port))
+        except OSError:
+            s.bind((host, 0))
+        return s.getsockname()[1]
 
 if __name__ == '__main__':
     try:
@@ -117,7 +96,7 @@ if __name__ == '__main__':
         if not os.path.exists(app_path):
             print(f"ОШИБКА: Файл app.py не найден по пути: {app_path}")
             print(f"Текущая рабочая директория: {os.getcwd()}")
-            if getattr(sys, 'frozen', False):
+            if _FROZEN:
                 print(f"Frozen режим: sys._MEIPASS = {getattr(sys, '_MEIPASS', 'N/A')}")
                 print(f"sys.executable = {sys.executable}")
             sys.exit(1)
@@ -127,19 +106,10 @@ if __name__ == '__main__':
         if base_path and os.path.exists(base_path):
             os.chdir(base_path)
         
-        # Найти свободный порт
-        # Проверяем порт 8501
-        if not is_port_available(8501):
-            # Порт 8501 занят, ищем свободный порт
-            port = find_free_port(8502)
+        # Выбрать порт: 8501, если свободен, иначе любой свободный порт от ядра
+        port = pick_port(8501)
+        if port != 8501:
             print(f"Порт 8501 занят, используется порт {port}")
-        else:
-            port = 8501
-        
-        # Проверим еще раз перед запуском, так как порт мог быть занят между проверкой и запуском
-        if not is_port_available(port):
-            port = find_free_port(port + 1)
-            print(f"Порт был занят, используется порт {port}")
         
         print(f"Запуск Streamlit на порту {port}")
         
@@ -1,15 +1,25 @@
 """
 Модуль для подключения к MS Project Server через REST API
-Управляет подключением с NTLM аутентификацией
+Управляет подключением с NTLM аутентификацией (или Kerberos, если доступен requests_kerberos)
 
 ВАЖНО: ВСЕ ОПЕРАЦИИ С СЕРВЕРОМ СТРОГО ТОЛЬКО ДЛЯ ЧТЕНИЯ!
 Изменение данных на сервере строго запрещено.
 Допускается только чтение данных через GET запросы.
 """
 import requests
+from requests.adapters import HTTPAdapter
 from requests_ntlm import HttpNtlmAuth  # type: ignore
+from urllib3.util.retry import Retry
 from msproject_utils import setup_logger
 
+# Kerberos (SPNEGO) - необязательная зависимость: билет передается с первым запросом,
+# без трехшагового NTLM-рукопожатия. Без пакета используется только NTLM
+try:
+    from requests_kerberos import HTTPKerberosAuth, OPTIONAL  # type: ignore
+except ImportError:
+    HTTPKerberosAuth = None
+    OPTIONAL = None
+
 # Константы подключения по умолчанию
 DEFAULT_SERVER_URL = "http://tpch-app04/Projects.aspx"
 DEFAULT_DOMAIN = "TECHPROM"
@@ -20,6 +30,17 @@ logger = setup_logger(__name__)
 # Константа для обеспечения read-only режима
 READ_ONLY_MODE = True  # Строго только чтение, изменения запрещены
 
+# Повтор GET-запросов при временных ошибках шлюза (502/503/504) с нарастающей паузой.
+# raise_on_status=False: после исчерпания попыток возвращается последний ответ, и его
+# статус разбирают обычные проверки вызывающего кода
+_RETRY_POLICY = Retry(
+    total=2,
+    backoff_factor=0.3,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=("GET",),
+    raise_on_status=False
+)
+
 
 class MSProjectServerConnection:
     """
@@ -45,7 +66,8 @@ class MSProjectServerConnection:
         if not READ_ONLY_MODE:
             logger.warning("ВНИМАНИЕ: READ_ONLY_MODE отключен! Это недопустимо.")
     
-    def connect(self, server_url, username, password, domain=None):
+    def connect(self, server_url, username, password, domain=None, verify_on_connect=False,
+                prefer_kerberos=False):
         """
         Установка соединения с MS Project Server по команде пользователя
         
@@ -57,6 +79,12 @@ class MSProjectServerConnection:
             username: Имя пользователя
             password: Пароль
             domain: Домен (опционально)
+            verify_on_connect: Если True, сразу выполнить тестовый GET-запрос к
+                ProjectData.svc и проверить учетные данные. Иначе проверка откладывается
+                до первого запроса загрузчика (лишний круг NTLM-рукопожатия не нужен)
+            prefer_kerberos: Если True и установлен requests_kerberos, аутентифицироваться
+                билетом Kerberos текущего пользователя. При verify_on_connect ответ 401
+                (нет билета) приводит к повторной проверке с NTLM
         
         Returns:
             bool: True при успешном подключении, False при ошибке
@@ -82,7 +110,24 @@ class MSProjectServerConnection:
             else:
                 ntlm_username = username
             
-            self._session.auth = HttpNtlmAuth(ntlm_username, password)
+            ntlm_auth = HttpNtlmAuth(ntlm_username, password)
+            use_kerberos = prefer_kerberos and HTTPKerberosAuth is not None
+            if use_kerberos:
+                logger.info("Аутентификация: Kerberos (SPNEGO)")
+                self._session.auth = HTTPKerberosAuth(mutual_authentication=OPTIONAL)
+            else:
+                self._session.auth = ntlm_auth
+            
+            # Пул соединений: последующие запросы используют уже аутентифицированные
+            # по NTLM keep-alive соединения вместо нового рукопожатия
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=_RETRY_POLICY)
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
+            
+            if not verify_on_connect:
+                self._is_connected = True
+                logger.info(f"Подключение к серверу подготовлено: {server_url} (READ-ONLY режим, проверка при первом запросе)")
+                return True
             
             # Тестовый запрос для проверки подключения
             # ВАЖНО: Используется ТОЛЬКО GET запрос для чтения
@@ -93,52 +138,52 @@ class MSProjectServerConnection:
                 # ВАЖНО: Только GET запрос - никаких изменений данных
                 response = self._session.get(test_url, timeout=10)
                 
+                # Нет билета Kerberos или сервер его не принял - проверить с NTLM
+                if response.status_code == 401 and use_kerberos:
+                    logger.info("Kerberos не принят сервером (401), повторная проверка с NTLM")
+                    self._session.auth = ntlm_auth
+                    response = self._session.get(test_url, timeout=10)
+                
                 # Проверка статуса ответа
-                if response.status_code == 200:
-                    # Успешное подключение
-                    self._is_connected = True
-                    logger.info(f"Успешно подключено к серверу: {server_url} (READ-ONLY режим)")
-                    return True
-                elif response.status_code == 401:
+                status = response.status_code
+                if status == 401:
                     # Ошибка аутентификации
-                    logger.error(f"Ошибка аутентификации. Проверьте учетные данные. Статус: {response.status_code}")
-                    self._session.close()
-                    self._session = None
-                    return False
-                elif 200 <= response.status_code < 300:
-                    # Другие успешные статусы
+                    logger.error(f"Ошибка аутентификации. Проверьте учетные данные. Статус: {status}")
+                    return self._fail_connect()
+                if 200 <= status < 300:
+                    # Успешное подключение
                     self._is_connected = True
                     logger.info(f"Успешно подключено к серверу: {server_url} (READ-ONLY режим)")
                     return True
-                else:
-                    logger.error(f"Ошибка подключения. Статус ответа: {response.status_code}")
-                    self._session.close()
-                    self._session = None
-                    return False
+                logger.error(f"Ошибка подключения. Статус ответа: {status}")
+                return self._fail_connect()
                     
             except requests.exceptions.Timeout:
                 logger.error("Ошибка подключения: превышено время ожидания ответа от сервера")
-                self._session.close()
-                self._session = None
-                return False
+                return self._fail_connect()
             except requests.exceptions.ConnectionError as e:
                 logger.error(f"Ошибка подключения: не удалось установить соединение с сервером. {str(e)}")
-                self._session.close()
-                self._session = None
-                return False
+                return self._fail_connect()
             except requests.exceptions.RequestException as e:
                 logger.error(f"Ошибка подключения: {str(e)}")
-                self._session.close()
-                self._session = None
-                return False
+                return self._fail_connect()
                 
         except Exception as e:
             logger.error(f"Неожиданная ошибка при подключении: {str(e)}")
-            if self._session:
-                self._session.close()
-                self._session = None
-            self._is_connected = False
-            return False
+            return self._fail_connect()
+    
+    def _fail_connect(self):
+        """
+        Закрывает сессию неудавшегося подключения
+        
+        Returns:
+            bool: Всегда False (результат connect при ошибке)
+        """
+        if self._session:
+            self._session.close()
+            self._session = None
+        self._is_connected = False
+        return False
     
     def disconnect(self):
         """
@@ -8,9 +8,14 @@
 """
 import requests
 import json
-from urllib.parse import urlparse, urlunparse
+from urllib.parse import urljoin, urlparse, urlunparse
 from msproject_utils import setup_logger
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Настройка логирования
 logger = setup_logger(__name__)
 
@@ -20,6 +25,72 @@ READ_ONLY_MODE = True  # Строго только чтение, изменен
 # Константа для PWA адреса (можно изменить для разных серверов)
 PWA_BASE_URL = "http://tpch-app04/_layouts/15/pwa/"
 
+# Таймаут OData-запросов (подключение, чтение): недоступный хост отсекается за ~3 с
+# вместо 30, медленный ответ сервера по-прежнему ждем до 27 с. Повторы при сбоях
+# соединения и ответах 502/503/504 выполняет адаптер сессии (_RETRY_POLICY в server_connection)
+_ODATA_TIMEOUT = (3.05, 27)
+
+
+def _loads_json_response(response):
+    """
+    Разбирает JSON-тело ответа сервера
+    
+    orjson читает байты ответа напрямую, без определения кодировки и декодирования
+    в str. Если orjson не установлен или не принял тело (например, BOM в начале),
+    используется response.json(). Ошибки разбора - подклассы json.JSONDecodeError.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            pass
+    return response.json()
+
+
+def _odata_results(data):
+    """
+    Извлекает список записей из OData-ответа
+    
+    Поддерживаются форматы {"d": {"results": [...]}}, {"d": [...]},
+    {"value": [...]} и прямой список.
+    
+    Returns:
+        tuple: (список записей или None, название формата для лога или None)
+    """
+    results = None
+    results_format = None
+    
+    # Стандартный формат OData: {"d": {"results": [...]}}
+    if isinstance(data, dict) and 'd' in data:
+        if isinstance(data['d'], dict) and 'results' in data['d']:
+            results, results_format = data['d']['results'], 'd.results'
+        elif isinstance(data['d'], list):
+            results, results_format = data['d'], 'd (list)'
+    
+    # Альтернативный формат: {"value": [...]}
+    if not results and isinstance(data, dict) and isinstance(data.get('value'), list):
+        results, results_format = data['value'], 'value'
+    
+    # Прямой список
+    if not results and isinstance(data, list):
+        results, results_format = data, 'прямого списка'
+    
+    return results, results_format
+
+
+def _odata_next_link(data):
+    """
+    Ссылка на следующую страницу OData-ответа или None
+    
+    OData v2 (ProjectData.svc) передает ее в d.__next, v3/v4 - в odata.nextLink
+    или @odata.nextLink.
+    """
+    if not isinstance(data, dict):
+        return None
+    if isinstance(data.get('d'), dict) and data['d'].get('__next'):
+        return data['d']['__next']
+    return data.get('odata.nextLink') or data.get('@odata.nextLink')
+
 
 class MSProjectServerDataLoader:
     """
@@ -50,6 +121,10 @@ class MSProjectServerDataLoader:
         """
         Возвращает заголовки для запроса JSON данных
         
+        Запросы идут через сессию подключения (MSProjectServerConnection), у которой
+        смонтирован пул соединений: явный keep-alive сохраняет уже аутентифицированное
+        по NTLM соединение для следующих GET-запросов к OData endpoints.
+        
         Returns:
             dict: Словарь с заголовками для JSON запросов
         """
@@ -57,6 +132,7 @@ class MSProjectServerDataLoader:
             'Accept': 'application/json, text/json, */*',
             'Content-Type': 'application/json',
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)',
+            'Connection': 'keep-alive',
         }
     
     def _load_projects_via_odata(self, session, base_url):
@@ -82,91 +158,151 @@ class MSProjectServerDataLoader:
             f"{base_url}/_api/ProjectData/Projects",  # SharePoint REST API
         ]
         
+        # Endpoints опрашиваются по очереди: сессия с NTLM аутентифицирует отдельное
+        # TCP-соединение, параллельные рукопожатия на общей сессии могут перепутать соединения
         for endpoint_url in odata_endpoints:
-            try:
-                logger.info(f"Попытка подключения к OData endpoint: {endpoint_url}")
-                
-                # ВАЖНО: Используется ТОЛЬКО GET запрос для чтения данных
-                response = session.get(endpoint_url, headers=headers, timeout=30)
-                
-                logger.info(f"Статус ответа: {response.status_code}")
-                logger.info(f"Content-Type: {response.headers.get('Content-Type', 'не указан')}")
-                
-                if response.status_code == 200:
-                    try:
-                        # Парсим JSON ответ
-                        data = response.json()
-                        logger.info(f"✓ Успешно получен JSON ответ от {endpoint_url}")
-                        
-                        # Извлекаем список проектов из OData формата
-                        projects_list = None
-                        
-                        # Стандартный формат OData: {"d": {"results": [...]}}
-                        if isinstance(data, dict) and 'd' in data:
-                            if isinstance(data['d'], dict) and 'results' in data['d']:
-                                projects_list = data['d']['results']
-                                logger.info(f"Найдены проекты в формате d.results: {len(projects_list)} записей")
-                            elif isinstance(data['d'], list):
-                                projects_list = data['d']
-                                logger.info(f"Найдены проекты в формате d (list): {len(projects_list)} записей")
-                        
-                        # Альтернативный формат: {"value": [...]}
-                        if not projects_list and isinstance(data, dict) and 'value' in data:
-                            if isinstance(data['value'], list):
-                                projects_list = data['value']
-                                logger.info(f"Найдены проекты в формате value: {len(projects_list)} записей")
+            projects_list = self._probe_odata_endpoint(session, endpoint_url, headers)
+            if projects_list:
+                return projects_list
+        
+        logger.error("Не удалось загрузить проекты ни через один OData endpoint")
+        return None
+    
+    def _probe_odata_endpoint(self, session, endpoint_url, headers):
+        """
+        Запрашивает список проектов у одного OData endpoint
+        
+        Все ошибки запроса и разбора логируются и не пробрасываются.
+        
+        Args:
+            session: requests.Session с активной аутентификацией
+            endpoint_url: URL OData endpoint
+            headers: Заголовки запроса
+        
+        Returns:
+            list: Список словарей с информацией о проектах или None при ошибке
+        """
+        try:
+            logger.info(f"Попытка подключения к OData endpoint: {endpoint_url}")
+            
+            # ВАЖНО: Используется ТОЛЬКО GET запрос для чтения данных
+            response = session.get(endpoint_url, headers=headers, timeout=_ODATA_TIMEOUT)
+            
+            logger.info(f"Статус ответа: {response.status_code}")
+            logger.info(f"Content-Type: {response.headers.get('Content-Type', 'не указан')}")
+            
+            if response.status_code == 200:
+                try:
+                    # Парсим JSON ответ
+                    data = _loads_json_response(response)
+                    logger.info(f"✓ Успешно получен JSON ответ от {endpoint_url}")
+                    
+                    # Извлекаем список проектов из OData формата
+                    projects_list, results_format = _odata_results(data)
+                    if results_format:
+                        logger.info(f"Найдены проекты в формате {results_format}: {len(projects_list)} записей")
+                    
+                    # Сервер отдает коллекцию страницами - дочитать остальные
+                    if projects_list:
+                        projects_list = self._load_odata_next_pages(
+                            session, endpoint_url, headers, data, projects_list, len(response.content)
+                        )
+                    
+                    if projects_list:
+                        logger.info(f"✓ Успешно загружено проектов через OData: {len(projects_list)}")
+                        logger.info(f"Использован endpoint: {endpoint_url}")
                         
-                        # Прямой список
-                        if not projects_list and isinstance(data, list):
-                            projects_list = data
-                            logger.info(f"Найдены проекты в формате прямого списка: {len(projects_list)} записей")
+                        # Логируем структуру первой записи для диагностики
+                        if len(projects_list) > 0 and isinstance(projects_list[0], dict):
+                            logger.info(f"Пример структуры проекта (ключи): {list(projects_list[0].keys())}")
                         
-                        if projects_list:
-                            logger.info(f"✓ Успешно загружено проектов через OData: {len(projects_list)}")
-                            logger.info(f"Использован endpoint: {endpoint_url}")
-                            
-                            # Логируем структуру первой записи для диагностики
-                            if len(projects_list) > 0 and isinstance(projects_list[0], dict):
-                                logger.info(f"Пример структуры проекта (ключи): {list(projects_list[0].keys())}")
-                            
-                            return projects_list
-                        else:
-                            logger.warning(f"Получен ответ 200, но не удалось найти список проектов в структуре данных")
-                            logger.debug(f"Структура данных (первые 500 символов): {str(data)[:500]}")
-                    
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Ошибка парсинга JSON от {endpoint_url}: {str(e)}")
-                        logger.debug(f"Первые 500 символов ответа: {response.text[:500]}")
-                        continue
+                        return projects_list
+                    else:
+                        logger.warning(f"Получен ответ 200, но не удалось найти список проектов в структуре данных")
+                        logger.debug(f"Структура данных (первые 500 символов): {str(data)[:500]}")
                 
-                elif response.status_code == 401:
-                    logger.warning(f"Ошибка аутентификации для {endpoint_url}")
-                    continue
-                elif response.status_code == 404:
-                    logger.info(f"Endpoint не найден (404) для {endpoint_url}, пробуем следующий...")
-                    continue
-                else:
-                    logger.warning(f"Неожиданный статус ответа {response.status_code} для {endpoint_url}")
-                    continue
-                    
-            except requests.exceptions.Timeout:
-                logger.warning(f"Превышено время ожидания для {endpoint_url}, пробуем следующий...")
-                continue
-            except requests.exceptions.ConnectionError as e:
-                logger.warning(f"Ошибка соединения для {endpoint_url}: {str(e)}, пробуем следующий...")
-                continue
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"Ошибка запроса для {endpoint_url}: {str(e)}, пробуем следующий...")
-                continue
-            except Exception as e:
-                logger.error(f"Неожиданная ошибка для {endpoint_url}: {str(e)}")
-                import traceback
-                logger.debug(traceback.format_exc())
-                continue
+                except json.JSONDecodeError as e:
+                    logger.error(f"Ошибка парсинга JSON от {endpoint_url}: {str(e)}")
+                    logger.debug(f"Первые 500 символов ответа: {response.text[:500]}")
+                    return None
+            
+            elif response.status_code == 401:
+                logger.warning(f"Ошибка аутентификации для {endpoint_url}")
+                return None
+            elif response.status_code == 404:
+                logger.info(f"Endpoint не найден (404) для {endpoint_url}, пробуем следующий...")
+                return None
+            else:
+                logger.warning(f"Неожиданный статус ответа {response.status_code} для {endpoint_url}")
+                return None
         
-        logger.error("Не удалось загрузить проекты ни через один OData endpoint")
+        except requests.exceptions.Timeout:
+            logger.warning(f"Превышено время ожидания для {endpoint_url}, пробуем следующий...")
+            return None
+        except requests.exceptions.ConnectionError as e:
+            logger.warning(f"Ошибка соединения для {endpoint_url}: {str(e)}, пробуем следующий...")
+            return None
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Ошибка запроса для {endpoint_url}: {str(e)}, пробуем следующий...")
+            return None
+        except Exception as e:
+            logger.error(f"Неожиданная ошибка для {endpoint_url}: {str(e)}")
+            import traceback
+            logger.debug(traceback.format_exc())
+            return None
         return None
     
+    def _load_odata_next_pages(self, session, endpoint_url, headers, data, projects_list, received_bytes):
+        """
+        Дочитывает страницы OData-коллекции по ссылкам серверного разбиения
+        
+        Project Server ограничивает размер ответа и указывает продолжение ссылкой
+        (см. _odata_next_link). Без обхода ссылок список проектов обрезается первой
+        страницей. При ошибке на очередной странице возвращаются уже полученные записи.
+        
+        Args:
+            session: requests.Session с активной аутентификацией
+            endpoint_url: URL первой страницы (относительные ссылки разрешаются от него)
+            headers: Заголовки запроса
+            data: Разобранный JSON первой страницы
+            projects_list: Записи первой страницы (дополняется на месте)
+            received_bytes: Размер тела первой страницы в байтах
+        
+        Returns:
+            list: Записи всех прочитанных страниц
+        """
+        page_url = endpoint_url
+        page_count = 1
+        
+        while True:
+            # Ссылка может быть относительной; повтор той же ссылки - защита от зацикливания
+            page_link = _odata_next_link(data)
+            next_url = urljoin(page_url, page_link) if page_link else None
+            if not next_url or next_url == page_url:
+                break
+            
+            logger.info(f"Загрузка следующей страницы OData: {next_url}")
+            try:
+                # ВАЖНО: Используется ТОЛЬКО GET запрос для чтения данных
+                response = session.get(next_url, headers=headers, timeout=_ODATA_TIMEOUT)
+                if response.status_code != 200:
+                    logger.warning(f"Неожиданный статус ответа {response.status_code} для {next_url}, загрузка страниц прервана")
+                    break
+                data = _loads_json_response(response)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.warning(f"Ошибка загрузки страницы {next_url}: {str(e)}, загрузка страниц прервана")
+                break
+            
+            page_results, _ = _odata_results(data)
+            if page_results:
+                projects_list.extend(page_results)
+            received_bytes += len(response.content)
+            page_count += 1
+            page_url = next_url
+        
+        logger.info(f"Прочитано страниц OData: {page_count}, записей: {len(projects_list)}, байт: {received_bytes}")
+        return projects_list
+    
     # Метод удален: парсинг HTML больше не используется, используется OData API
     # def _parse_html_tags_projects(self, html_text):
     #     """Удален: используется OData API вместо парсинга HTML"""
@@ -185,22 +321,24 @@ class MSProjectServerDataLoader:
                    format_type - 'json', 'xml' или None
         """
         content_type = response.headers.get('Content-Type', '').lower()
-        text = response.text
         
         # Проверяем Content-Type
         if 'application/json' in content_type or 'text/json' in content_type:
             try:
-                data = response.json()
+                data = _loads_json_response(response)
                 return data, 'json'
             except ValueError:
                 logger.warning("Content-Type указывает JSON, но парсинг не удался")
+        else:
+            # Пытаемся распарсить как JSON
+            try:
+                data = _loads_json_response(response)
+                return data, 'json'
+            except ValueError:
+                pass
         
-        # Пытаемся распарсить как JSON
-        try:
-            data = response.json()
-            return data, 'json'
-        except ValueError:
-            pass
+        # Текст (с определением кодировки) нужен только для XML и неизвестного формата
+        text = response.text
         
         # Проверяем XML
         if content_type.startswith('application/xml') or content_type.startswith('text/xml') or text.strip().startswith('<?xml'):
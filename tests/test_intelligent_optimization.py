@@ -0,0 +1,221 @@
+"""
+Тесты для модуля intelligent_optimization.py
+"""
+import pytest
+import numpy as np
+from datetime import date
+from app import MSProjectParser
+from intelligent_optimization import (
+    evaluate_shift_grid,
+    optimize_with_task_shifting,
+    build_critical_finish_index
+)
+
+
+def _make_weeks(first_monday, loads, capacity=40):
+    """Недели с границами (порядковые номера дней) и показателями загрузки"""
+    weeks = []
+    for i, hours in enumerate(loads):
+        start = first_monday.toordinal() + 7 * i
+        weeks.append({
+            'start': start,
+            'end': start + 6,
+            'hours': hours,
+            'capacity': capacity,
+            'percentage': hours / capacity * 100
+        })
+    return weeks
+
+
+def _make_parser():
+    """Парсер с одним перегруженным ресурсом: 60 ч в первую неделю"""
+    parser = MSProjectParser(b'')
+    parser.tasks = [
+        {'id': '1', 'name': 'Big', 'start': '2025-01-06T08:00:00',
+         'finish': '2025-01-10T17:00:00', 'predecessors': []},
+        {'id': '2', 'name': 'Small', 'start': '2025-01-06T08:00:00',
+         'finish': '2025-01-10T17:00:00', 'predecessors': []},
+        {'id': '3', 'name': 'Tail', 'start': '2025-01-20T08:00:00',
+         'finish': '2025-01-26T17:00:00', 'predecessors': []},
+    ]
+    parser.resources = [{'id': '1', 'name': 'Dev', 'max_units': 1.0, 'is_inactive': False}]
+    parser.assignments = [
+        {'resource_name': 'Dev', 'task_name': t['name'], 'task_start': t['start'],
+         'task_finish': t['finish'], 'work': work}
+        for t, work in zip(parser.tasks, ['PT40H0M0S', 'PT20H0M0S', 'PT8H0M0S'])
+    ]
+    return parser
+
+
+class TestEvaluateShiftGrid:
+    """Тесты для функции evaluate_shift_grid"""
+
+    # Задача ср-пт первой недели (3 дня по 8 ч) в неделе на 60 ч при емкости 40 ч
+    TASK_START = date(2025, 1, 8).toordinal()
+    TASK_END = date(2025, 1, 10).toordinal()
+    TASK_HOURS = 24
+
+    def _evaluate(self, loads, max_shift, min_shift=1):
+        """Лучшая пара (неделя, сдвиг) для задачи из первой недели среди остальных недель"""
+        weeks = _make_weeks(date(2025, 1, 6), loads)
+        return evaluate_shift_grid(
+            self.TASK_START, self.TASK_END, self.TASK_HOURS, 0, np.arange(1, len(weeks)),
+            np.array([w['start'] for w in weeks]),
+            np.array([w['end'] for w in weeks]),
+            np.array([w['hours'] for w in weeks], dtype=float),
+            np.array([w['capacity'] for w in weeks], dtype=float),
+            np.array([w['percentage'] for w in weeks], dtype=float),
+            max_shift, min_shift
+        )
+
+    def test_grid_moves_whole_task_out(self):
+        """Наименьший сдвиг, уводящий задачу из исходной недели целиком, в ближайшую неделю"""
+        result = self._evaluate([60, 10, 5, 30], max_shift=20)
+
+        assert result[:2] == (1, 5)
+        assert result[2:] == pytest.approx((60.0, 24.0, 24.0))
+
+    def test_grid_partial_overlap(self):
+        """Часть задачи остается в исходной неделе: переносятся часы только ушедших дней"""
+        # Сдвиг на 3 дня: задача занимает сб-пн, в следующую неделю уходит только пн (8 ч из 24)
+        result = self._evaluate([60, 30, 5, 30], max_shift=3)
+
+        assert result[:2] == (1, 3)
+        assert result[2:] == pytest.approx((20.0, 8.0, 8.0))
+
+    def test_grid_skips_overloaded_target(self):
+        """Целевая неделя, которая превысила бы 100%, пропускается"""
+        # Во вторую неделю (33 ч) не помещается даже один день задачи (8 ч)
+        result = self._evaluate([60, 33, 5, 30], max_shift=20)
+
+        # Сдвиг на 10 дней: пт попадает в третью неделю, ср-чт - во вторую
+        assert result[:2] == (2, 10)
+        assert result[2:] == pytest.approx((60.0, 24.0, 8.0))
+
+    def test_grid_respects_min_shift(self):
+        """Сдвиги меньше min_shift не рассматриваются"""
+        result = self._evaluate([60, 10, 5, 30], max_shift=20, min_shift=8)
+
+        assert result[:2] == (1, 8)
+        assert result[2:] == pytest.approx((60.0, 24.0, 24.0))
+
+    def test_grid_no_candidates(self):
+        """Без целевых недель сдвиг не предлагается"""
+        weeks = _make_weeks(date(2025, 1, 6), [60])
+        result = evaluate_shift_grid(
+            weeks[0]['start'], weeks[0]['end'], 40, 0,
+            np.array([], dtype=int),
+            np.array([weeks[0]['start']]), np.array([weeks[0]['end']]),
+            np.array([60.0]), np.array([40.0]), np.array([150.0]), 14
+        )
+        assert result == (None, None, 0, 0, 0)
+
+
+class TestOptimizeWithTaskShifting:
+    """Тесты для функции optimize_with_task_shifting"""
+
+    def test_suggests_shift_for_overloaded_week(self):
+        """Перегруженная неделя порождает рекомендацию по сдвигу"""
+        parser = _make_parser()
+        suggestions = optimize_with_task_shifting(
+            parser, {'max_shift_days': 14, 'target_load': 85, 'mode': 'balance'}
+        )
+
+        assert len(suggestions) >= 1
+        suggestion = suggestions[0]
+        assert suggestion['resource'] == 'Dev'
+        assert suggestion['type'] == 'shift_task'
+        assert 1 <= suggestion['shift_days'] <= 14
+        assert float(suggestion['hours_freed']) > 0
+
+    def test_shift_respects_predecessors(self):
+        """Сдвиг не ставит задачу раньше окончания предшественника"""
+        parser = _make_parser()
+        parser.tasks.append({'id': '4', 'name': 'Gate', 'start': '2025-01-06T08:00:00',
+                             'finish': '2025-01-14T17:00:00', 'predecessors': []})
+        for task in parser.tasks[:2]:
+            task['predecessors'] = ['4']
+
+        suggestions = optimize_with_task_shifting(
+            parser, {'max_shift_days': 14, 'target_load': 85, 'mode': 'balance'}
+        )
+
+        assert len(suggestions) >= 1
+        for suggestion in suggestions:
+            assert suggestion['suggested_start'] > '2025-01-14'
+
+    def test_shift_respects_transitive_predecessors(self):
+        """Сдвиг не ставит задачу раньше окончания предшественника ее предшественника"""
+        parser = _make_parser()
+        parser.tasks.append({'id': '4', 'name': 'Gate', 'start': '2025-01-06T08:00:00',
+                             'finish': '2025-01-14T17:00:00', 'predecessors': []})
+        parser.tasks.append({'id': '5', 'name': 'Review', 'start': '2025-01-06T08:00:00',
+                             'finish': '2025-01-08T17:00:00', 'predecessors': ['4']})
+        for task in parser.tasks[:2]:
+            task['predecessors'] = ['5']
+
+        suggestions = optimize_with_task_shifting(
+            parser, {'max_shift_days': 14, 'target_load': 85, 'mode': 'balance'}
+        )
+
+        assert len(suggestions) >= 1
+        for suggestion in suggestions:
+            assert suggestion['suggested_start'] > '2025-01-14'
+
+    def test_top_k_limits_and_sorts_suggestions(self):
+        """Возвращаются только top_k лучших рекомендаций по убыванию улучшения"""
+        parser = _make_parser()
+        settings = {'max_shift_days': 14, 'target_load': 85, 'mode': 'minimize_peaks'}
+        all_suggestions = optimize_with_task_shifting(parser, settings)
+        improvements = [float(s['improvement'].rstrip('%')) for s in all_suggestions]
+        assert len(all_suggestions) == 2
+        assert improvements == sorted(improvements, reverse=True)
+
+        top = optimize_with_task_shifting(parser, dict(settings, top_k=1))
+        assert top == all_suggestions[:1]
+
+    def test_no_suggestions_without_overload(self):
+        """Без перегрузки рекомендаций нет"""
+        parser = _make_parser()
+        parser.assignments = parser.assignments[1:]
+        suggestions = optimize_with_task_shifting(parser, {'max_shift_days': 14})
+        assert suggestions == []
+
+
+class TestBuildCriticalFinishIndex:
+    """Тесты для функции build_critical_finish_index"""
+
+    def test_direct_predecessor(self):
+        """Для задачи с предшественником хранится окончание предшественника"""
+        parser = MSProjectParser(b'')
+        task_dict = {
+            '1': {'id': '1', 'name': 'Pred', 'finish': '2025-01-10T17:00:00', 'predecessors': []},
+            '2': {'id': '2', 'name': 'Succ', 'finish': '2025-01-15T17:00:00', 'predecessors': ['1']},
+        }
+        crit_finish_ord = build_critical_finish_index(parser, task_dict)
+        assert crit_finish_ord == {'2': date(2025, 1, 10).toordinal()}
+
+    def test_transitive_predecessor(self):
+        """Учитывается самое позднее окончание по всей цепочке предшественников"""
+        parser = MSProjectParser(b'')
+        task_dict = {
+            '1': {'id': '1', 'name': 'Root', 'finish': '2025-01-20T17:00:00', 'predecessors': []},
+            '2': {'id': '2', 'name': 'Mid', 'finish': '2025-01-10T17:00:00', 'predecessors': ['1']},
+            '3': {'id': '3', 'name': 'Leaf', 'finish': '2025-01-25T17:00:00', 'predecessors': ['2']},
+        }
+        crit_finish_ord = build_critical_finish_index(parser, task_dict)
+        assert crit_finish_ord['3'] == date(2025, 1, 20).toordinal()
+        assert '1' not in crit_finish_ord
+
+    def test_cycle_falls_back_to_direct_predecessors(self):
+        """Циклические зависимости не зацикливают построение индекса"""
+        parser = MSProjectParser(b'')
+        task_dict = {
+            '1': {'id': '1', 'name': 'A', 'finish': '2025-01-10T17:00:00', 'predecessors': ['2']},
+            '2': {'id': '2', 'name': 'B', 'finish': '2025-01-12T17:00:00', 'predecessors': ['1']},
+        }
+        crit_finish_ord = build_critical_finish_index(parser, task_dict)
+        assert crit_finish_ord == {
+            '1': date(2025, 1, 12).toordinal(),
+            '2': date(2025, 1, 10).toordinal(),
+        }
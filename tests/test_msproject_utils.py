@@ -6,14 +6,20 @@ from datetime import datetime, date, timedelta
 from msproject_utils import (
     get_namespace,
     make_tag,
+    clark_tag,
+    clark_tags,
+    iter_elements,
     find_elements,
     get_text,
     parse_date,
     parse_work_hours,
+    parse_work_hours_batch,
     calculate_business_days,
     calculate_work_capacity,
     calculate_available_work_hours,
-    find_task_by_name_and_dates
+    find_task_by_name_and_dates,
+    build_task_index,
+    find_task_in_index
 )
 
 
@@ -52,6 +58,26 @@ class TestMakeTag:
         assert tag == 'Resource'
 
 
+class TestClarkTag:
+    """Тесты для функции clark_tag"""
+    
+    def test_clark_tag_with_namespace(self):
+        """Тест перевода тега с префиксом в нотацию Кларка"""
+        namespace = {'ns': 'http://schemas.microsoft.com/project'}
+        assert clark_tag('ns:Resource', namespace) == '{http://schemas.microsoft.com/project}Resource'
+    
+    def test_clark_tag_without_namespace(self):
+        """Тест: без namespace тег не меняется"""
+        assert clark_tag('Resource', {}) == 'Resource'
+        assert clark_tag('{urn:x}Resource', {'ns': 'urn:y'}) == '{urn:x}Resource'
+    
+    def test_clark_tags_preserves_order(self):
+        """Тест: clark_tags переводит набор тегов в порядке аргументов"""
+        namespace = {'ns': 'urn:p'}
+        assert clark_tags(namespace, 'UID', 'Name') == ('{urn:p}UID', '{urn:p}Name')
+        assert clark_tags({}, 'UID', 'Name') == ('UID', 'Name')
+
+
 class TestFindElements:
     """Тесты для функции find_elements"""
     
@@ -74,6 +100,14 @@ class TestFindElements:
         namespace = {'ns': 'http://schemas.microsoft.com/project'}
         tasks = find_elements(xml_with_namespace, 'Task', namespace)
         assert len(tasks) == 0
+    
+    def test_iter_elements_matches_find_elements(self, xml_with_namespace):
+        """Тест: iter_elements возвращает те же элементы, что и find_elements"""
+        namespace = {'ns': 'http://schemas.microsoft.com/project'}
+        found = find_elements(xml_with_namespace, 'Resource', namespace)
+        assert list(iter_elements(xml_with_namespace, 'Resource', namespace)) == found
+        # Сам корень не входит в результат, как и в './/tag'
+        assert list(iter_elements(xml_with_namespace, 'Project', namespace)) == []
 
 
 class TestGetText:
@@ -117,6 +151,14 @@ class TestGetText:
         elem.text = '  Test Value  '
         text = get_text(elem, '{http://schemas.microsoft.com/project}Test', namespace)
         assert text == 'Test Value'
+    
+    def test_get_text_empty_child_element(self):
+        """Тест: пустой дочерний элемент дает default (findtext возвращает для него '')"""
+        from lxml import etree
+        namespace = {'ns': 'urn:p'}
+        parent = etree.Element('{urn:p}Resource')
+        etree.SubElement(parent, '{urn:p}Name')
+        assert get_text(parent, make_tag('Name', namespace), namespace, default='x') == 'x'
 
 
 class TestParseDate:
@@ -221,6 +263,28 @@ class TestParseWorkHours:
         assert result == 0
 
 
+class TestParseWorkHoursBatch:
+    """Тесты для функции parse_work_hours_batch"""
+    
+    def test_batch_matches_scalar(self):
+        """Тест: результат поэлементно совпадает с parse_work_hours"""
+        work_strings = ['PT8H0M0S', 'P2DT4H30M0S', 'P1D', 'PT0H30M0S', '12.5', 'invalid', '', None]
+        result = parse_work_hours_batch(work_strings)
+        expected = [parse_work_hours(w) for w in work_strings]
+        assert list(result) == pytest.approx(expected)
+    
+    def test_batch_empty(self):
+        """Тест пустого списка"""
+        assert len(parse_work_hours_batch([])) == 0
+    
+    def test_batch_without_pandas(self, monkeypatch):
+        """Тест поэлементного пути без pandas"""
+        import msproject_utils
+        monkeypatch.setattr(msproject_utils, 'pd', None)
+        result = parse_work_hours_batch(['PT8H0M0S', 'P1DT2H0M0S'])
+        assert result == [8.0, 10.0]
+
+
 class TestCalculateBusinessDays:
     """Тесты для функции calculate_business_days"""
     
@@ -268,6 +332,17 @@ class TestCalculateBusinessDays:
         end = date(2024, 1, 1)
         result = calculate_business_days(start, end)
         assert result == 0
+    
+    def test_calculate_business_days_without_numpy(self, monkeypatch):
+        """Тест расчета без numpy (формула по полным неделям) совпадает с numpy"""
+        import msproject_utils
+        start = date(2024, 1, 3)  # Среда
+        expected = [calculate_business_days(start, start + timedelta(days=n)) for n in range(60)]
+        
+        monkeypatch.setattr(msproject_utils, 'np', None)
+        result = [calculate_business_days(start, start + timedelta(days=n)) for n in range(60)]
+        assert result == expected
+        assert calculate_business_days(date(2024, 1, 1), date(2024, 12, 31)) == 262
 
 
 class TestCalculateWorkCapacity:
@@ -308,6 +383,19 @@ class TestCalculateAvailableWorkHours:
         result = calculate_available_work_hours(start, end)
         assert result > 0
     
+    def test_calculate_available_work_hours_datetime_whole_days(self):
+        """Тест: время суток не влияет, считаются календарные дни включительно"""
+        result = calculate_available_work_hours(
+            datetime(2024, 1, 1, 17, 0, 0), datetime(2024, 1, 7, 8, 0, 0)
+        )
+        assert result == pytest.approx(
+            calculate_available_work_hours(date(2024, 1, 1), date(2024, 1, 7))
+        )
+    
+    def test_calculate_available_work_hours_end_before_start(self):
+        """Тест: конец раньше начала дает минимум 1 рабочий день"""
+        assert calculate_available_work_hours(date(2024, 1, 5), date(2024, 1, 1)) == 8
+    
     def test_calculate_available_work_hours_none_start(self):
         """Тест расчета с None в качестве начальной даты"""
         result = calculate_available_work_hours(None, date(2024, 1, 5))
@@ -396,4 +484,44 @@ class TestFindTaskByNameAndDates:
         )
         assert task is not None
         assert task['name'] == 'Task 1'
+    
+    @pytest.mark.parametrize('task_name,task_start,task_finish', [
+        ('Task 1', None, None),
+        ('Task 1', '2025-01-01T08:00:00', '2025-01-05T17:00:00'),
+        ('Task 1', '2025-12-01T08:00:00', None),
+        ('NonExistent Task', None, None),
+    ])
+    def test_find_task_with_task_index(self, sample_tasks, task_name, task_start, task_finish):
+        """Тест: поиск через индекс build_task_index совпадает с полным проходом"""
+        task_index = build_task_index(sample_tasks)
+        expected = find_task_by_name_and_dates(sample_tasks, task_name, task_start, task_finish)
+        task = find_task_by_name_and_dates(
+            sample_tasks, task_name, task_start, task_finish, task_index=task_index
+        )
+        assert task is expected
 
+
+class TestFindTaskInIndex:
+    """Тесты для функций build_task_index и find_task_in_index"""
+    
+    @pytest.mark.parametrize('task_name,task_start,task_finish', [
+        ('Task 1', '2025-01-01T08:00:00', '2025-01-05T17:00:00'),
+        ('Task 1', '2025-01-01', None),
+        ('Task 1', None, '2025-01-05T00:00:00'),
+        ('Task 2', None, None),
+        ('Task 1', '2025-01-06T08:00:00', '2025-01-10T17:00:00'),
+        ('Task 3', None, None),
+        ('', None, None),
+    ])
+    def test_matches_linear_search(self, sample_tasks, task_name, task_start, task_finish):
+        """Тест: поиск по индексу совпадает с find_task_by_name_and_dates"""
+        task_index = build_task_index(sample_tasks)
+        expected = find_task_by_name_and_dates(sample_tasks, task_name, task_start, task_finish)
+        assert find_task_in_index(task_index, task_name, task_start, task_finish) is expected
+    
+    def test_duplicate_keys_return_first_task(self, sample_tasks):
+        """Тест: при совпадающих имени и датах возвращается первая задача"""
+        duplicate = dict(sample_tasks[0], id='3')
+        task_index = build_task_index(sample_tasks + [duplicate])
+        task = find_task_in_index(task_index, 'Task 1', '2025-01-01T08:00:00', '2025-01-05T17:00:00')
+        assert task['id'] == '1'
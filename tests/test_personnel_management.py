@@ -0,0 +1,98 @@
+"""
+Тесты для записи и чтения файла сотрудников в personnel_management.py
+"""
+import json
+import os
+import pytest
+import personnel_management
+from personnel_management import _write_employees_file, _loads_employees, _employee_table_columns
+
+
+@pytest.fixture
+def employees_data():
+    """Данные сотрудников с кириллицей и группами"""
+    return {
+        'resources': [
+            {'name': 'Иванов Иван', 'max_units': '1.0'},
+            {'name': 'Петров Петр', 'max_units': '0,5'}
+        ],
+        'resource_groups': {'Разработчики': ['Иванов Иван']}
+    }
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def serializer(request, monkeypatch):
+    """Запись через orjson (если установлен) и через запасной путь json"""
+    if request.param == 'orjson':
+        if personnel_management.orjson is None:
+            pytest.skip("orjson не установлен")
+    else:
+        monkeypatch.setattr(personnel_management, 'orjson', None)
+    return request.param
+
+
+class TestWriteEmployeesFile:
+    """Тесты для функции _write_employees_file"""
+    
+    def test_roundtrip(self, tmp_path, employees_data, serializer):
+        """Тест: записанный файл читается обратно без потерь, в UTF-8 с отступом 2"""
+        target = tmp_path / 'employees.json'
+        _write_employees_file(str(target), employees_data)
+        
+        raw = target.read_bytes()
+        assert json.loads(raw.decode('utf-8')) == employees_data
+        assert _loads_employees(raw) == employees_data
+        assert 'Иванов Иван'.encode('utf-8') in raw
+        assert b'\n  "resources"' in raw
+    
+    def test_replaces_existing_file(self, tmp_path, employees_data, serializer):
+        """Тест: существующий файл подменяется целиком, временные файлы не остаются"""
+        target = tmp_path / 'employees.json'
+        target.write_text('{"resources": [], "resource_groups": {}, "old": true}', encoding='utf-8')
+        
+        _write_employees_file(str(target), employees_data)
+        
+        assert json.loads(target.read_text(encoding='utf-8')) == employees_data
+        assert os.listdir(tmp_path) == ['employees.json']
+    
+    @pytest.mark.skipif(os.name != 'posix', reason="права доступа POSIX")
+    def test_keeps_file_mode(self, tmp_path, employees_data):
+        """Тест: права прежнего файла сохраняются (mkstemp создает файл с 0600)"""
+        target = tmp_path / 'employees.json'
+        target.write_text('{}', encoding='utf-8')
+        os.chmod(target, 0o640)
+        
+        _write_employees_file(str(target), employees_data)
+        
+        assert os.stat(target).st_mode & 0o777 == 0o640
+    
+    def test_failed_write_keeps_old_file(self, tmp_path):
+        """Тест: при ошибке сериализации старый файл остается целым"""
+        target = tmp_path / 'employees.json'
+        target.write_text('{"resources": []}', encoding='utf-8')
+        
+        with pytest.raises(TypeError):
+            _write_employees_file(str(target), {'resources': [object()]})
+        
+        assert target.read_text(encoding='utf-8') == '{"resources": []}'
+        assert os.listdir(tmp_path) == ['employees.json']
+
+
+class TestEmployeeTableColumns:
+    """Тесты для функции _employee_table_columns"""
+    
+    def test_columns_follow_resource_order(self, employees_data):
+        """Тест: колонки идут в порядке сотрудников, Max Units - строки"""
+        resources = employees_data['resources'] + [{'name': 'Сидоров Сидор', 'max_units': 1}]
+        
+        columns = _employee_table_columns(resources)
+        
+        assert columns == {
+            'Имя': ['Иванов Иван', 'Петров Петр', 'Сидоров Сидор'],
+            'Max Units': ['1.0', '0,5', '1']
+        }
+    
+    def test_missing_fields_use_defaults(self):
+        """Тест: пустое имя и Max Units по умолчанию для неполных записей"""
+        assert _employee_table_columns([{}]) == {'Имя': [''], 'Max Units': ['1.0']}
+        assert _employee_table_columns([]) == {'Имя': [], 'Max Units': []}
@@ -0,0 +1,110 @@
+"""
+Тесты для загрузки проектов через OData в server_data_loader.py
+"""
+import json
+import pytest
+import requests
+from server_data_loader import MSProjectServerDataLoader
+
+ENDPOINT_URL = 'http://server/ProjectData.svc/Projects'
+
+
+def make_response(payload, status_code=200):
+    """Ответ requests с JSON-телом"""
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers['Content-Type'] = 'application/json'
+    response._content = json.dumps(payload).encode('utf-8')
+    return response
+
+
+class FakeSession:
+    """Сессия, отдающая заранее заданные ответы по полному URL"""
+    
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested_urls = []
+    
+    def get(self, url, headers=None, timeout=None):
+        self.requested_urls.append(url)
+        if url not in self.pages:
+            raise requests.exceptions.MissingSchema(f"Invalid URL {url!r}")
+        return make_response(self.pages[url])
+
+
+@pytest.fixture
+def loader():
+    """Загрузчик без подключения (методы OData получают сессию параметром)"""
+    return MSProjectServerDataLoader(None)
+
+
+class TestProbeOdataEndpoint:
+    """Тесты для постраничной загрузки в _probe_odata_endpoint"""
+    
+    def test_relative_next_link_on_first_page(self, loader):
+        """Тест: относительная ссылка первой страницы разрешается от URL endpoint"""
+        session = FakeSession({
+            ENDPOINT_URL: {'d': {'results': [{'ProjName': 'A'}], '__next': 'Projects?$skiptoken=1'}},
+            ENDPOINT_URL + '?$skiptoken=1': {'d': {'results': [{'ProjName': 'B'}]}},
+        })
+        
+        projects = loader._probe_odata_endpoint(session, ENDPOINT_URL, {})
+        
+        assert [p['ProjName'] for p in projects] == ['A', 'B']
+        assert session.requested_urls == [ENDPOINT_URL, ENDPOINT_URL + '?$skiptoken=1']
+    
+    def test_absolute_next_links(self, loader):
+        """Тест: страницы дочитываются по абсолютным ссылкам odata.nextLink"""
+        session = FakeSession({
+            ENDPOINT_URL: {'value': [{'ProjName': 'A'}], 'odata.nextLink': ENDPOINT_URL + '?$skip=1'},
+            ENDPOINT_URL + '?$skip=1': {'value': [{'ProjName': 'B'}], 'odata.nextLink': ENDPOINT_URL + '?$skip=2'},
+            ENDPOINT_URL + '?$skip=2': {'value': [{'ProjName': 'C'}]},
+        })
+        
+        projects = loader._probe_odata_endpoint(session, ENDPOINT_URL, {})
+        
+        assert [p['ProjName'] for p in projects] == ['A', 'B', 'C']
+    
+    def test_failed_page_keeps_loaded_projects(self, loader):
+        """Тест: ошибка на очередной странице не теряет уже полученные проекты"""
+        session = FakeSession({
+            ENDPOINT_URL: {'d': {'results': [{'ProjName': 'A'}], '__next': ENDPOINT_URL + '?$skiptoken=1'}},
+        })
+        
+        projects = loader._probe_odata_endpoint(session, ENDPOINT_URL, {})
+        
+        assert [p['ProjName'] for p in projects] == ['A']
+    
+    def test_repeated_next_link_stops(self, loader):
+        """Тест: ссылка на ту же страницу не зацикливает загрузку"""
+        session = FakeSession({
+            ENDPOINT_URL: {'d': {'results': [{'ProjName': 'A'}], '__next': ENDPOINT_URL}},
+        })
+        
+        projects = loader._probe_odata_endpoint(session, ENDPOINT_URL, {})
+        
+        assert [p['ProjName'] for p in projects] == ['A']
+        assert session.requested_urls == [ENDPOINT_URL]
+
+
+class TestLoadProjectsViaOdata:
+    """Тесты для перебора OData endpoints в _load_projects_via_odata"""
+    
+    def test_first_endpoint_wins(self, loader):
+        """Тест: при ответе первого endpoint второй не запрашивается"""
+        session = FakeSession({ENDPOINT_URL: {'d': {'results': [{'ProjName': 'A'}]}}})
+        
+        projects = loader._load_projects_via_odata(session, 'http://server')
+        
+        assert [p['ProjName'] for p in projects] == ['A']
+        assert session.requested_urls == [ENDPOINT_URL]
+    
+    def test_falls_back_to_second_endpoint(self, loader):
+        """Тест: endpoints опрашиваются по очереди, ошибка первого ведет ко второму"""
+        rest_url = 'http://server/_api/ProjectData/Projects'
+        session = FakeSession({rest_url: {'value': [{'ProjName': 'B'}]}})
+        
+        projects = loader._load_projects_via_odata(session, 'http://server')
+        
+        assert [p['ProjName'] for p in projects] == ['B']
+        assert session.requested_urls == [ENDPOINT_URL, rest_url]
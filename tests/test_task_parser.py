@@ -224,3 +224,17 @@ class TestParseTasks:
         tasks = parser._parse_tasks(root, namespace)
         assert len(tasks) == 0
 
+
+
+class TestCleanXmlContent:
+    """Тесты для MSProjectParser.clean_xml_content"""
+    
+    def test_removes_invalid_xml_chars(self):
+        """Тест удаления недопустимых в XML 1.0 символов"""
+        content = 'a\x00b\x0bc\td\ne\rf￾g￿h\U0001F600 Задача'.encode('utf-8')
+        result = MSProjectParser.clean_xml_content(content)
+        assert result == 'abc\td\ne\rfgh\U0001F600 Задача'.encode('utf-8')
+    
+    def test_invalid_utf8_is_ignored(self):
+        """Тест: некорректные байты UTF-8 отбрасываются"""
+        assert MSProjectParser.clean_xml_content(b'<a>\xff\x01</a>') == b'<a></a>'